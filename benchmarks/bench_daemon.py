@@ -0,0 +1,105 @@
+# bench_daemon.py
+"""
+Time `status` answered by the daemon against `status` read in-process.
+
+A synthetic repository is generated for each size and a daemon is started
+on a temporary socket. Then these are timed:
+
+  status_in_process  `main.py status --format count --no-daemon`, a new process each run
+  status_daemon      `main.py status --format count` with the daemon running
+  rpc_unchanged      one status request on the socket, nothing changed since the last
+  rpc_after_edit     one status request after a file in the working tree was rewritten
+
+The rpc_* rows are what a shell prompt or an editor talking to the socket
+directly would see. Run from the repository root:
+
+    python benchmarks/bench_daemon.py --sizes small medium
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_repo import create_synthetic_repo, dirty_paths
+from bench_suite import SIZES, measure, summarize
+
+MAIN = os.path.join(REPO_ROOT, 'main.py')
+# The watcher reports a change once nothing else changed for the debounce time
+SETTLE_SECONDS = 0.2
+
+
+def bench_size(spec, root, repeat):
+    from src.daemon_client import call
+
+    os.makedirs(root)
+    work, _ = create_synthetic_repo(root, spec)
+    # A tracked file make_dirty already modified
+    edited = os.path.join(work, dirty_paths(spec)[-1])
+
+    def status(*extra):
+        subprocess.run([sys.executable, MAIN, 'status', '--format', 'count', *extra],
+                       cwd=work, stdout=subprocess.DEVNULL, check=True)
+
+    def edit():
+        with open(edited, 'a') as f:
+            f.write('edit\n')
+        time.sleep(SETTLE_SECONDS)
+
+    results = {'status_in_process': measure(lambda: status('--no-daemon'), repeat)}
+    daemon = subprocess.Popen([sys.executable, MAIN, 'daemon', 'run'], stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(os.environ['GIT_HELPER_DAEMON_SOCKET']):
+            if time.monotonic() > deadline:
+                raise RuntimeError("the daemon did not start")
+            time.sleep(0.02)
+        # The first request opens the repository
+        call('status', path=work)
+        results['status_daemon'] = measure(status, repeat)
+        results['rpc_unchanged'] = measure(lambda: call('status', path=work), repeat)
+        results['rpc_after_edit'] = measure(lambda: call('status', path=work), repeat, setup=edit)
+    finally:
+        call('shutdown')
+        daemon.wait()
+    return {operation: summarize(timings) for operation, timings in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['small', 'medium'], help='repository sizes to run')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per operation')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='git-helper-bench-daemon-')
+    # Set before src.config is imported, so this run never talks to the user's own daemon
+    os.environ['GIT_HELPER_DAEMON_SOCKET'] = os.path.join(root, 'daemon.sock')
+    results = {}
+    try:
+        for size in args.sizes:
+            print(f"Running {size}...", file=sys.stderr)
+            results[size] = bench_size(SIZES[size], os.path.join(root, size), args.repeat)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    for size, stats in results.items():
+        print(f"\n{size}")
+        for operation, summary in stats.items():
+            print(f"  {operation:<20} median {summary['median_ms']:>9.1f} ms   min {summary['min_ms']:>9.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# bench_fetch.py
+"""
+Compare a narrow single-branch fetch with a full fetch.
+
+Creates a local bare "origin" with many branches, clones it and times
+repeated fetches in both modes. Run from the repository root:
+
+    python benchmarks/bench_fetch.py --branches 10000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from src.git_fetch import get_fetch_args
+from synthetic_repo import RepoSpec, create_synthetic_repo, run_git
+
+
+def time_fetch(clone, fetch_args, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_git(clone, *fetch_args)
+        timings.append(time.perf_counter() - start)
+    return min(timings), sum(timings) / len(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--branches', type=int, default=10000, help='number of extra branches on origin')
+    parser.add_argument('--repeat', type=int, default=5, help='fetches per mode')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        # One small commit, so only the number of refs matters
+        spec = RepoSpec(files=1, commits=1, tags=0, non_semver_tags=0, branches=args.branches)
+        clone, _ = create_synthetic_repo(root, spec)
+
+        # Warm up both modes so only ref advertisement and negotiation are timed
+        run_git(clone, *get_fetch_args('main', full=True))
+        for mode, fetch_args in [
+            ('branch', get_fetch_args('main', full=False)),
+            ('full', get_fetch_args('main', full=True)),
+        ]:
+            best, mean = time_fetch(clone, fetch_args, args.repeat)
+            print(f"{mode:>6} fetch, {args.branches} branches: best {best * 1000:.1f} ms, mean {mean * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+# bench_remote.py
+"""
+Time the operations that talk to origin at different network latencies.
+
+A synthetic repository's origin is served through latency_remote.py, which
+adds a round-trip time and an optional bandwidth limit. For each RTT these
+are timed, each moving a new commit of --payload-kb random bytes:
+
+  compare_with_origin  the fetch behind a status refresh, then the comparison
+  git_pull             fetch and fast-forward
+  git_push             fetch, then push one commit
+  tag_version          patch bump, changelog commit and atomic push of branch and tag
+
+The new commits on origin are pushed from a second clone without the proxy
+before each run. Results can be written as JSON. Run from the repository root:
+
+    python benchmarks/bench_remote.py --rtt-ms 0 5 50 200
+    python benchmarks/bench_remote.py --rtt-ms 0 200 --bandwidth-kbps 2000 --transport file
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+from contextlib import redirect_stdout
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_repo import RepoSpec, create_synthetic_repo, clone, run_git
+from latency_remote import configure_remote
+from bench_suite import measure, summarize
+
+SPEC = RepoSpec(files=2000, commits=500, tags=100, non_semver_tags=10)
+
+
+class Upstream:
+    """A clone that pushes new commits to origin directly, as a colleague would."""
+
+    def __init__(self, origin, path, payload_kb):
+        clone(origin, path)
+        self.path = path
+        self.payload_kb = payload_kb
+        self.count = 0
+
+    def commit(self, cwd=None):
+        """Commit a new file of random bytes in cwd (default: this clone)."""
+        cwd = cwd or self.path
+        self.count += 1
+        name = f'payload/{os.path.basename(cwd)}-{self.count:04d}.bin'
+        os.makedirs(os.path.join(cwd, 'payload'), exist_ok=True)
+        with open(os.path.join(cwd, name), 'wb') as payload:
+            payload.write(os.urandom(self.payload_kb * 1024))
+        run_git(cwd, 'add', name)
+        run_git(cwd, 'commit', '-q', '-m', f'feat: add {name}')
+
+    def push_new_commit(self):
+        run_git(self.path, 'pull', '-q', '--ff-only')
+        self.commit()
+        run_git(self.path, 'push', '-q', 'origin', 'HEAD')
+
+
+def bench_latency(work, origin, upstream, transport, rtt_ms, bandwidth_kbps, repeat):
+    """Time every remote operation over a link with rtt_ms and bandwidth_kbps."""
+    from git import Repo
+    from src import git_fetch
+    from src.utils import compare_with_origin
+    from src.git_pull import git_pull
+    from src.git_push import git_push
+    from src.tag import tag_version
+
+    env = configure_remote(work, origin, transport, rtt_ms, bandwidth_kbps)
+    saved_env = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    repo = Repo(work)
+    branch = repo.active_branch.name
+
+    def fetch_and_compare():
+        git_fetch.fetch_origin(repo, branch)
+        return compare_with_origin(repo, branch)
+
+    def before_pull():
+        upstream.push_new_commit()
+        # git_pull would otherwise reuse the fetch of the run before
+        git_fetch._session_fetches.clear()
+
+    def check(result):
+        if result is False:
+            raise RuntimeError(f"operation failed over the {transport} transport at {rtt_ms} ms")
+
+    try:
+        results = {
+            'compare_with_origin': measure(fetch_and_compare, repeat, setup=upstream.push_new_commit),
+            'git_pull': measure(lambda: check(git_pull(repo, branch)), repeat, setup=before_pull),
+            'git_push': measure(lambda: check(git_push(repo, branch)), repeat, setup=lambda: upstream.commit(work)),
+            'tag_version': measure(lambda: check(tag_version(repo, None, bump='patch', changes='bench')), repeat),
+        }
+    finally:
+        repo.close()
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+    return {operation: summarize(timings) for operation, timings in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rtt-ms', type=float, nargs='+', default=[0, 5, 50, 200], help='round-trip times to run')
+    parser.add_argument('--bandwidth-kbps', type=float, default=0, help='link speed in kilobits per second (0: unlimited)')
+    parser.add_argument('--transport', choices=['ssh', 'file', 'ext'], default='ssh', help='how git reaches the proxy')
+    parser.add_argument('--payload-kb', type=int, default=64, help='size of the file in each new commit')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per operation')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    results = {
+        'meta': {
+            'transport': args.transport,
+            'bandwidth_kbps': args.bandwidth_kbps,
+            'payload_kb': args.payload_kb,
+            'repeat': args.repeat,
+            'spec': SPEC.to_dict(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'rtt_ms': {},
+    }
+
+    root = tempfile.mkdtemp(prefix='git-helper-bench-remote-')
+    cwd = os.getcwd()
+    try:
+        work, origin = create_synthetic_repo(root, SPEC)
+        # tag_version writes CHANGELOG.md in the working directory's repository
+        with open(os.path.join(work, 'CHANGELOG.md'), 'w') as changelog:
+            changelog.write('# Changelog\n')
+        run_git(work, 'add', 'CHANGELOG.md')
+        run_git(work, 'commit', '-q', '-m', 'Add changelog')
+        run_git(work, 'push', '-q', 'origin', 'HEAD')
+        upstream = Upstream(origin, os.path.join(root, 'upstream'), args.payload_kb)
+        os.chdir(work)
+
+        for rtt_ms in args.rtt_ms:
+            print(f"Running {args.transport} at {rtt_ms:g} ms RTT...", file=sys.stderr)
+            logging.disable(logging.CRITICAL)
+            try:
+                with redirect_stdout(io.StringIO()):
+                    results['rtt_ms'][f'{rtt_ms:g}'] = bench_latency(
+                        work, origin, upstream, args.transport, rtt_ms, args.bandwidth_kbps, args.repeat)
+            finally:
+                logging.disable(logging.NOTSET)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+    operations = list(next(iter(results['rtt_ms'].values())))
+    print(f"\n{'RTT':>8}  " + ''.join(f'{operation:>22}' for operation in operations))
+    for rtt, stats in results['rtt_ms'].items():
+        print(f"{rtt + ' ms':>8}  " + ''.join(f"{stats[operation]['median_ms']:>19.1f} ms" for operation in operations))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
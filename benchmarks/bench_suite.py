@@ -0,0 +1,217 @@
+# bench_suite.py
+"""
+Time the main git-helper operations on synthetic repositories of several sizes.
+
+For each size a repository is generated with synthetic_repo.py (files,
+commits, semver and non-semver tags, ahead of and behind a local bare
+origin, uncommitted changes), then these are timed:
+
+  initialize_repository (cold: no tag cache; warm: cache on disk and in memory)
+  compare_with_origin
+  get_uncommitted_changes
+  stage_files (the git_add staging step) on the uncommitted files
+  tag_version (patch bump, changelog commit and push), on a clean clone
+
+Results are written as JSON. With --baseline, a run fails (exit code 1)
+when an operation is slower than the baseline by more than --threshold
+and by more than --min-delta-ms. Run from the repository root:
+
+    python benchmarks/bench_suite.py --sizes small medium --output bench.json
+    python benchmarks/bench_suite.py --baseline bench.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from contextlib import redirect_stdout
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_repo import RepoSpec, create_synthetic_repo, dirty_paths, clone, run_git
+
+SIZES = {
+    'small': RepoSpec(files=200, commits=50, tags=20, non_semver_tags=5, ahead=2, behind=3, untracked=20, modified=10),
+    'medium': RepoSpec(files=5000, commits=1000, tags=200, non_semver_tags=20, ahead=5, behind=10, untracked=200, modified=50),
+    'large': RepoSpec(files=50000, commits=10000, tags=2000, non_semver_tags=100, ahead=20, behind=50, untracked=2000, modified=500),
+}
+
+DEFAULT_THRESHOLD = 1.25    # Slower than baseline by more than 25%...
+DEFAULT_MIN_DELTA_MS = 5.0  # ...and by more than 5 ms counts as a regression
+
+
+def measure(function, repeat, setup=None):
+    """Call function repeat times (after setup, which is not timed) and return the timings in ms."""
+    timings = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    return {
+        'min_ms': round(min(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'mean_ms': round(statistics.mean(timings), 2),
+        'runs': len(timings),
+    }
+
+
+def bench_size(spec, root, repeat):
+    """Generate one repository and time every operation on it."""
+    # Imported here so the repository root is already on sys.path
+    from src import tag_index
+    from src.cache import get_cache_dir
+    from src.utils import initialize_repository, compare_with_origin, get_uncommitted_changes
+    from src.git_add import stage_files
+    from src.tag import tag_version
+
+    cwd = os.getcwd()
+    start = time.perf_counter()
+    work, origin = create_synthetic_repo(root, spec)
+    generated_seconds = time.perf_counter() - start
+
+    os.chdir(work)
+    repo, branch, latest_tag = initialize_repository()
+    paths = dirty_paths(spec)
+
+    def clear_tag_cache():
+        shutil.rmtree(get_cache_dir(repo), ignore_errors=True)
+        tag_index._loaded_indexes.clear()
+
+    def unstage():
+        run_git(work, 'reset', '-q')
+
+    results = {
+        'initialize_repository_cold': measure(initialize_repository, repeat, setup=clear_tag_cache),
+        'initialize_repository_warm': measure(initialize_repository, repeat),
+        'compare_with_origin': measure(lambda: compare_with_origin(repo, branch), repeat),
+        'get_uncommitted_changes': measure(lambda: get_uncommitted_changes(repo), repeat),
+        'stage_files': measure(lambda: stage_files(repo, paths), repeat, setup=unstage),
+    }
+    unstage()
+
+    # Tagging needs a clean tree, and every run adds a tag and a commit
+    clean = os.path.join(root, 'clean')
+    clone(origin, clean)
+    with open(os.path.join(clean, 'CHANGELOG.md'), 'w') as changelog:
+        changelog.write('# Changelog\n')
+    run_git(clean, 'add', 'CHANGELOG.md')
+    run_git(clean, 'commit', '-q', '-m', 'Add changelog')
+    os.chdir(clean)
+    clean_repo, _, clean_tag = initialize_repository()
+    results['tag_version'] = measure(lambda: tag_version(clean_repo, clean_tag, bump='patch', changes='bench'), repeat)
+
+    os.chdir(cwd)
+    repo.close()
+    clean_repo.close()
+    return {
+        'spec': spec.to_dict(),
+        'generated_seconds': round(generated_seconds, 2),
+        'latest_tag': latest_tag,
+        'operations': {operation: summarize(timings) for operation, timings in results.items()},
+    }
+
+
+def compare_with_baseline(results, baseline, threshold, min_delta_ms):
+    """Return a line for every operation that got slower than in baseline."""
+    regressions = []
+    for size, current in results['sizes'].items():
+        previous = baseline.get('sizes', {}).get(size)
+        if not previous:
+            continue
+        for operation, stats in current['operations'].items():
+            before = previous['operations'].get(operation)
+            if not before:
+                continue
+            # Medians are less affected by one slow run than means
+            now, then = stats['median_ms'], before['median_ms']
+            if now > then * threshold and now - then > min_delta_ms:
+                regressions.append(f"{size}/{operation}: {then:.1f} ms -> {now:.1f} ms ({now / then:.2f}x)")
+    return regressions
+
+
+def print_table(results):
+    for size, result in results['sizes'].items():
+        spec = result['spec']
+        print(f"\n{size}: {spec['files']} files, {spec['commits']} commits, {spec['tags']} tags "
+              f"(generated in {result['generated_seconds']} s)")
+        for operation, stats in result['operations'].items():
+            print(f"  {operation:<28} median {stats['median_ms']:>9.1f} ms   min {stats['min_ms']:>9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZES), default=['small', 'medium'], help='repository sizes to run')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per operation')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='slowdown ratio that counts as a regression')
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS, help='ignore slowdowns smaller than this')
+    parser.add_argument('--keep', action='store_true', help='keep the generated repositories and print where they are')
+    args = parser.parse_args()
+
+    import git
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'git': subprocess.run(['git', '--version'], capture_output=True, text=True).stdout.strip(),
+            'gitpython': git.__version__,
+            'repeat': args.repeat,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'sizes': {},
+    }
+
+    workdir = tempfile.mkdtemp(prefix='git-helper-bench-')
+    try:
+        for size in args.sizes:
+            print(f"Running {size}...", file=sys.stderr)
+            root = os.path.join(workdir, size)
+            os.makedirs(root)
+            # The operations log and print as they would in the menu
+            logging.disable(logging.CRITICAL)
+            try:
+                with redirect_stdout(io.StringIO()):
+                    results['sizes'][size] = bench_size(SIZES[size], root, args.repeat)
+            finally:
+                logging.disable(logging.NOTSET)
+    finally:
+        if args.keep:
+            print(f"Repositories kept in {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare_with_baseline(results, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            print("\nRegressions against the baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions against the baseline.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# check_sync.py
+"""
+Check what `sync` reports for repositories in known states.
+
+A workspace of clones with local bare origins is generated, one clone per
+case, then `main.py sync --json` is run over it (fetch only, then with
+--pull) and each repository's outcome is compared with the expected one:
+
+  up-to-date    nothing new on origin
+  behind        origin has 3 new commits: fetched, then fast-forwarded
+  diverged      2 local and 2 remote commits: skipped, branch left as it was
+  detached      detached HEAD: skipped
+  new-branch    a branch that was never pushed: skipped
+  unreachable   origin was deleted: fails with a network error
+  slow          origin answers through latency_remote.py after 10 s: times out
+
+The slow repository must not hold the others up: the whole run has to end
+within --timeout plus a margin. Exits 1 if anything differs. Run from the
+repository root:
+
+    python benchmarks/check_sync.py
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_repo import RepoSpec, create_synthetic_repo, head_of, run_git, BRANCH
+from latency_remote import configure_remote
+
+MAIN = os.path.join(REPO_ROOT, 'main.py')
+SLOW_RTT_MS = 10000
+# Time allowed on top of --timeout for starting Python and the other repositories
+MARGIN_SECONDS = 5
+
+# Case -> (RepoSpec arguments, expected after `sync`, expected after `sync --pull`);
+# each expectation is (outcome, error_kind)
+CASES = {
+    'up-to-date': ({}, ('fetched', None), ('up-to-date', None)),
+    'behind': ({'behind': 3}, ('fetched', None), ('updated', None)),
+    'diverged': ({'ahead': 2, 'behind': 2}, ('fetched', None), ('skipped', 'not-fast-forward')),
+    'detached': ({}, ('skipped', None), ('skipped', None)),
+    'new-branch': ({}, ('skipped', 'no-remote-branch'), ('skipped', 'no-remote-branch')),
+    'unreachable': ({}, ('failed', 'network'), ('failed', 'network')),
+    'slow': ({}, ('failed', 'timeout'), ('failed', 'timeout')),
+}
+
+
+def build_workspace(root):
+    """Create one clone per case under root/<case>/work and return {case: (work, origin)}."""
+    repos = {}
+    for case, (spec_args, _, _) in CASES.items():
+        case_root = os.path.join(root, case)
+        os.makedirs(case_root)
+        work, origin = create_synthetic_repo(case_root, RepoSpec(files=10, commits=5, tags=1, non_semver_tags=0, **spec_args))
+        repos[case] = (work, origin)
+
+    run_git(repos['detached'][0], 'checkout', '-q', '--detach')
+    run_git(repos['new-branch'][0], 'checkout', '-q', '-b', 'feature/never-pushed')
+    shutil.rmtree(repos['unreachable'][1])
+    configure_remote(repos['slow'][0], repos['slow'][1], 'file', rtt_ms=SLOW_RTT_MS)
+    return repos
+
+
+def run_sync(root, timeout, *extra):
+    """Run `main.py sync --json` over root and return ({case: result}, seconds)."""
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, MAIN, 'sync', root, '--json', '--timeout', str(timeout), *extra],
+        stdout=subprocess.PIPE, check=False,
+    )
+    seconds = time.perf_counter() - started
+    report = json.loads(completed.stdout)
+    return {result['name'].split(os.sep)[0]: result for result in report['results']}, seconds
+
+
+def check_run(label, results, seconds, timeout, expected_index):
+    """Print one line per case and return the number of mismatches."""
+    failures = 0
+    print(f"\n{label} ({seconds:.1f} s)")
+    for case, expectations in CASES.items():
+        expected = expectations[expected_index]
+        result = results.get(case)
+        actual = (result['outcome'], result['error_kind']) if result else ('missing', None)
+        ok = actual == expected
+        failures += not ok
+        detail = result['detail'] if result else ''
+        print(f"  {'ok  ' if ok else 'FAIL'} {case:<12} {actual[0]:<11} {actual[1] or '':<17} {detail}")
+        if not ok:
+            print(f"       expected {expected[0]} {expected[1] or ''}")
+    if seconds > timeout + MARGIN_SECONDS:
+        print(f"  FAIL took {seconds:.1f} s; the slow repository held the others up")
+        failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--timeout', type=float, default=2, help='seconds before sync gives up on a repository')
+    parser.add_argument('--keep', action='store_true', help='keep the generated workspace')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='git-helper-check-sync-')
+    try:
+        repos = build_workspace(root)
+        heads = {case: head_of(work) for case, (work, _) in repos.items() if case != 'new-branch'}
+        origin_head = head_of(repos['behind'][1])
+
+        failures = check_run('sync', *run_sync(root, args.timeout), args.timeout, 1)
+        failures += check_run('sync --pull', *run_sync(root, args.timeout, '--pull'), args.timeout, 2)
+
+        # Only the branch that was behind may have moved
+        for case, head in heads.items():
+            expected = origin_head if case == 'behind' else head
+            if head_of(repos[case][0]) != expected:
+                print(f"  FAIL {case}: {BRANCH} is at {head_of(repos[case][0])[:7]}, expected {expected[:7]}")
+                failures += 1
+    finally:
+        if args.keep:
+            print(f"\nWorkspace kept at {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print(f"\n{'All cases passed' if not failures else f'{failures} check(s) failed'}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
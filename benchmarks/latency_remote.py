@@ -0,0 +1,171 @@
+# latency_remote.py
+"""
+Serve a local bare repository as if it were behind a slow network.
+
+This script sits between git and the server side (git-upload-pack or
+git-receive-pack) and forwards bytes in both directions. Each chunk is
+delivered half a round trip after it was read, and no faster than the
+bandwidth limit allows. Git runs it as one of these stand-ins:
+
+  ssh    GIT_SSH_COMMAND runs it in place of ssh, for ssh://<host>/<path> URLs
+  file   remote.<name>.uploadpack/receivepack run it around the real programs, for file:// URLs
+  ext    an ext::<command> %S <path> URL runs it directly (git speaks
+         protocol v0 over ext::, so it sees every ref on each connection)
+
+configure_remote() sets any of these up on a clone, so that GitPython and
+git-helper talk to the "remote" without knowing it is local.
+
+Every connection starts a Python process, which adds a fixed cost of some
+tens of milliseconds. Compare against a run with --rtt-ms 0 rather than
+reading the timings as absolute.
+"""
+import os
+import sys
+import time
+import shlex
+import queue
+import argparse
+import threading
+import subprocess
+
+from synthetic_repo import run_git
+
+SCRIPT = os.path.abspath(__file__)
+CHUNK_BYTES = 16 * 1024
+PROXY_HOST = 'latency-proxy'
+
+# ssh options git may pass before the host (OpenSSH variant); all but -4/-6 take a value
+SSH_FLAGS = {'-4', '-6'}
+
+
+# --- Set up a clone to use the slow remote --- #
+def proxy_command(rtt_ms=0, bandwidth_kbps=0, *mode):
+    """Return the shell command that runs this proxy with the given link."""
+    return shlex.join([sys.executable, SCRIPT, '--rtt-ms', str(rtt_ms), '--bandwidth-kbps', str(bandwidth_kbps), *mode])
+
+
+def configure_remote(clone_path, origin, transport, rtt_ms=0, bandwidth_kbps=0, remote='origin'):
+    """
+    Point remote at origin through the proxy and return the environment
+    variables git needs for it (to be added to os.environ).
+    """
+    origin = os.path.abspath(origin)
+    for key in ('uploadpack', 'receivepack'):
+        run_git(clone_path, 'config', '--unset-all', f'remote.{remote}.{key}', check=False)
+    if transport == 'ssh':
+        run_git(clone_path, 'remote', 'set-url', remote, f'ssh://{PROXY_HOST}{origin}')
+        # The OpenSSH variant passes GIT_PROTOCOL on, so protocol v2 still works
+        return {'GIT_SSH_COMMAND': proxy_command(rtt_ms, bandwidth_kbps, 'ssh'), 'GIT_SSH_VARIANT': 'ssh'}
+    if transport == 'file':
+        run_git(clone_path, 'remote', 'set-url', remote, f'file://{origin}')
+        for key, program in (('uploadpack', 'git-upload-pack'), ('receivepack', 'git-receive-pack')):
+            run_git(clone_path, 'config', f'remote.{remote}.{key}', proxy_command(rtt_ms, bandwidth_kbps, 'exec', program))
+        return {}
+    if transport == 'ext':
+        # ext:: splits on spaces, so the interpreter and script paths must not contain any
+        command = ' '.join([sys.executable, SCRIPT, '--rtt-ms', str(rtt_ms), '--bandwidth-kbps', str(bandwidth_kbps), 'exec', '%S', origin])
+        run_git(clone_path, 'remote', 'set-url', remote, f'ext::{command}')
+        run_git(clone_path, 'config', 'protocol.ext.allow', 'always')
+        return {}
+    raise ValueError(f"Unknown transport: {transport}")
+
+
+# --- The proxy --- #
+class DelayedPipe:
+    """Copies one file descriptor to another, delaying and rate-limiting what passes through."""
+
+    def __init__(self, source_fd, target_fd, delay, bytes_per_second):
+        self.source_fd = source_fd
+        self.target_fd = target_fd
+        self.delay = delay
+        self.bytes_per_second = bytes_per_second
+        self.chunks = queue.Queue()
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.writer = threading.Thread(target=self._write, daemon=True)
+
+    def start(self):
+        self.reader.start()
+        self.writer.start()
+
+    def _read(self):
+        while True:
+            try:
+                chunk = os.read(self.source_fd, CHUNK_BYTES)
+            except OSError:
+                chunk = b''
+            self.chunks.put((time.monotonic() + self.delay, chunk))
+            if not chunk:
+                return
+
+    def _write(self):
+        link_free = 0.0
+        while True:
+            due, chunk = self.chunks.get()
+            if not chunk:
+                os.close(self.target_fd)
+                return
+            # A chunk arrives after the delay, once the link has sent whatever was queued before it
+            arrival = due
+            if self.bytes_per_second:
+                arrival = max(due, link_free) + len(chunk) / self.bytes_per_second
+                link_free = arrival
+            wait = arrival - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                _write_all(self.target_fd, chunk)
+            except OSError:
+                return
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def parse_ssh_command(args):
+    """Return the remote command from ssh arguments: [options...] host command."""
+    args = list(args)
+    while args and args[0].startswith('-'):
+        option = args.pop(0)
+        if option not in SSH_FLAGS and len(option) == 2:
+            args.pop(0)
+    if len(args) < 2:
+        raise SystemExit(f"latency_remote: expected a host and a command, got {args}")
+    return ['sh', '-c', ' '.join(args[1:])]
+
+
+def serve(command, rtt_ms, bandwidth_kbps):
+    """Run the server command, forwarding our stdin/stdout to it through delayed pipes."""
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    one_way = rtt_ms / 2000
+    bytes_per_second = bandwidth_kbps * 1000 / 8
+    # The pipes close their ends themselves when the other side finishes
+    server_in, server_out = os.dup(process.stdin.fileno()), os.dup(process.stdout.fileno())
+    process.stdin.close()
+    process.stdout.close()
+    upstream = DelayedPipe(sys.stdin.fileno(), server_in, one_way, bytes_per_second)
+    downstream = DelayedPipe(server_out, sys.stdout.fileno(), one_way, bytes_per_second)
+    upstream.start()
+    downstream.start()
+    returncode = process.wait()
+    # Everything the server printed still has to reach git
+    downstream.writer.join()
+    return returncode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rtt-ms', type=float, default=0, help='round-trip time to add')
+    parser.add_argument('--bandwidth-kbps', type=float, default=0, help='link speed in kilobits per second (0: unlimited)')
+    parser.add_argument('mode', choices=['ssh', 'exec'], help='ssh: arguments are ssh options, host and command; exec: arguments are the command')
+    parser.add_argument('args', nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    command = parse_ssh_command(args.args) if args.mode == 'ssh' else args.args
+    sys.exit(serve(command, args.rtt_ms, args.bandwidth_kbps))
+
+
+if __name__ == '__main__':
+    main()
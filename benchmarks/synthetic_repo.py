@@ -0,0 +1,182 @@
+# synthetic_repo.py
+"""
+Generate local repositories of a given shape for the benchmarks.
+
+History is written with a single `git fast-import` stream, so even tens of
+thousands of files and commits take seconds. Each repository comes with a
+local bare "origin" and can be made to be ahead of and behind it, with
+uncommitted changes in the working tree.
+"""
+import os
+import subprocess
+
+GIT_ENV = {
+    'GIT_AUTHOR_NAME': 'bench',
+    'GIT_AUTHOR_EMAIL': 'bench@example.com',
+    'GIT_COMMITTER_NAME': 'bench',
+    'GIT_COMMITTER_EMAIL': 'bench@example.com',
+    'GIT_CONFIG_NOSYSTEM': '1',
+}
+
+BRANCH = 'main'
+FIRST_TIMESTAMP = 1700000000
+
+
+class RepoSpec:
+    """The shape of a synthetic repository."""
+
+    def __init__(self, files=100, commits=10, tags=5, non_semver_tags=2, ahead=0, behind=0,
+                 untracked=0, modified=0, branches=0, files_per_dir=100):
+        self.files = files                      # Tracked files in the first commit
+        self.commits = commits                  # Length of the shared history
+        self.tags = tags                        # Semantic version tags spread over the history
+        self.non_semver_tags = non_semver_tags  # Tags such as 'latest' or 'v3' that are not semver
+        self.ahead = ahead                      # Local commits not on origin
+        self.behind = behind                    # Commits on origin not yet merged locally
+        self.untracked = untracked              # New files in the working tree
+        self.modified = modified                # Tracked files changed in the working tree
+        self.branches = branches                # Extra branches on origin
+        self.files_per_dir = files_per_dir
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+def run_git(cwd, *args, input=None, check=True):
+    return subprocess.run(
+        ['git', *args], cwd=cwd, input=input, check=check,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env={**os.environ, **GIT_ENV},
+    ).stdout
+
+
+def file_path(spec, number):
+    return f'src/d{number // spec.files_per_dir:04d}/file{number:06d}.txt'
+
+
+def semver_tag(number):
+    return f'{number // 100}.{(number // 10) % 10}.{number % 10 + 1}'
+
+
+class FastImportStream:
+    """Builds a `git fast-import` stream of commits on one branch."""
+
+    def __init__(self, branch=BRANCH, parent=None, timestamp=FIRST_TIMESTAMP):
+        self.branch = branch
+        self.parts = []
+        self.mark = 0
+        self.parent = parent  # Object name of the commit the first commit builds on
+        self.timestamp = timestamp
+
+    def commit(self, message, files):
+        """Add a commit that writes files ({path: content}) and return its mark."""
+        self.mark += 1
+        self.timestamp += 60
+        who = f'bench <bench@example.com> {self.timestamp} +0000'
+        message = message.encode()
+        parts = [
+            f'commit refs/heads/{self.branch}\nmark :{self.mark}\nauthor {who}\ncommitter {who}\n'.encode(),
+            b'data %d\n' % len(message), message, b'\n',
+        ]
+        if self.parent:
+            parts.append(f'from {self.parent}\n'.encode())
+            self.parent = None
+        for path, content in files.items():
+            content = content.encode()
+            parts.append(f'M 100644 inline {path}\n'.encode())
+            parts.append(b'data %d\n' % len(content))
+            parts.extend((content, b'\n'))
+        parts.append(b'\n')
+        self.parts.extend(parts)
+        return self.mark
+
+    def tag(self, name, mark):
+        self.parts.append(f'reset refs/tags/{name}\nfrom :{mark}\n\n'.encode())
+
+    def run(self, repo_path):
+        run_git(repo_path, 'fast-import', '--quiet', '--force', input=b''.join(self.parts))
+
+
+def clone(origin, path):
+    """Clone origin to path, with a committer identity for the code under test."""
+    run_git(os.path.dirname(path), 'clone', '-q', f'file://{origin}', path)
+    run_git(path, 'config', 'user.name', GIT_ENV['GIT_AUTHOR_NAME'])
+    run_git(path, 'config', 'user.email', GIT_ENV['GIT_AUTHOR_EMAIL'])
+
+
+def head_of(repo_path):
+    return run_git(repo_path, 'rev-parse', f'refs/heads/{BRANCH}').decode().strip()
+
+
+def create_synthetic_repo(root, spec):
+    """
+    Create root/origin.git and a clone of it at root/work shaped by spec.
+
+    Returns (work_path, origin_path).
+    """
+    origin = os.path.join(root, 'origin.git')
+    seed = os.path.join(root, 'seed')
+    work = os.path.join(root, 'work')
+    run_git(root, 'init', '-q', '--bare', f'--initial-branch={BRANCH}', origin)
+    run_git(root, 'init', '-q', '--bare', f'--initial-branch={BRANCH}', seed)
+
+    # Shared history: every file in the first commit, then one edit per commit
+    stream = FastImportStream()
+    marks = [stream.commit('Initial commit', {file_path(spec, i): f'{i}\n' for i in range(spec.files)})]
+    for number in range(1, spec.commits):
+        edited = number % max(spec.files, 1)
+        marks.append(stream.commit(f'fix: update file {edited}', {file_path(spec, edited): f'{edited} v{number}\n'}))
+
+    # Tags spread evenly over the history, with the non-semver ones in between
+    tag_names = [semver_tag(number) for number in range(spec.tags)]
+    other_names = ['latest'] + [f'v{number}' if number % 2 else f'release-{number}' for number in range(1, spec.non_semver_tags)]
+    for names in (tag_names, other_names[:spec.non_semver_tags]):
+        for position, name in enumerate(names):
+            stream.tag(name, marks[(position + 1) * len(marks) // len(names) - 1])
+    stream.run(seed)
+    run_git(seed, 'push', '-q', origin, f'refs/heads/{BRANCH}', '--tags')
+
+    if spec.branches:
+        # Extra branches straight in the bare repository, in one call
+        head = head_of(origin)
+        updates = ''.join(f'create refs/heads/feature/{i:05d} {head}\n' for i in range(spec.branches))
+        run_git(origin, 'update-ref', '--stdin', input=updates.encode())
+        run_git(origin, 'pack-refs', '--all')
+
+    clone(origin, work)
+
+    if spec.behind:
+        # New commits pushed to origin by "someone else", then fetched
+        upstream = FastImportStream(parent=head_of(seed), timestamp=FIRST_TIMESTAMP + 60 * (spec.commits + 1))
+        for number in range(spec.behind):
+            upstream.commit(f'feat: remote change {number}', {f'remote/file{number:05d}.txt': f'{number}\n'})
+        upstream.run(seed)
+        run_git(seed, 'push', '-q', origin, f'refs/heads/{BRANCH}')
+        run_git(work, 'fetch', '-q', 'origin')
+
+    if spec.ahead:
+        local = FastImportStream(parent=head_of(work), timestamp=FIRST_TIMESTAMP + 60 * (spec.commits + 1))
+        for number in range(spec.ahead):
+            local.commit(f'feat: local change {number}', {f'local/file{number:05d}.txt': f'{number}\n'})
+        local.run(work)
+        run_git(work, 'reset', '-q', '--hard', BRANCH)
+
+    make_dirty(work, spec)
+    return work, origin
+
+
+def make_dirty(work, spec):
+    """Add spec.untracked new files and change spec.modified tracked files."""
+    for number in range(spec.untracked):
+        path = os.path.join(work, 'untracked', f'd{number // spec.files_per_dir:04d}', f'new{number:06d}.txt')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as new_file:
+            new_file.write(f'{number}\n')
+    for number in range(min(spec.modified, spec.files)):
+        with open(os.path.join(work, file_path(spec, number)), 'a') as tracked:
+            tracked.write('changed\n')
+
+
+def dirty_paths(spec):
+    """Return the working tree paths make_dirty creates or changes."""
+    untracked = [f'untracked/d{number // spec.files_per_dir:04d}/new{number:06d}.txt' for number in range(spec.untracked)]
+    return untracked + [file_path(spec, number) for number in range(min(spec.modified, spec.files))]
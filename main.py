@@ -1,4 +1,6 @@
 import os
+import sys
+import threading
 
 from src.config import (
     BOLD_TEXT,
@@ -16,10 +18,10 @@ from src.config import (
     PROGRAM_HELP_TEXT,
     PROGRAM_VERSION,
     PROGRAM_DATE,
+    STATUS_CACHE_ENABLED,
 )
 
 from src.display import (
-    clear_screen,
     display_title,
     prompt_to_continue,
     log_options,
@@ -29,55 +31,185 @@ from src.display import (
     get_user_choice,
     UserChoice,
     print_repository_info,
+    print_repository_details,
+    print_fetch_state,
     print_status,
+    print_trace_summary,
+    CHOICE_PROMPT,
 )
 
 from src.utils import (
-    print_section_header,
     setup_logging,
-    get_repo_root,
     initialize_repository,
-    get_org_and_repo_name,
-    get_uncommitted_changes,
     compare_with_origin,
+    get_origin_url,
 )
+from src.git_fetch import FetchScheduler, get_last_fetch_age, get_fetch_head_age
+from src.status_cache import load_status_snapshot, save_status_snapshot
+from src.screen import ScreenRenderer, capture_output, use_plain_output
+from src.trace import get_tracer
 
-from src.git_pull import git_pull
-from src.git_push import git_push
-from src.git_add import git_add
-from src.git_commit import git_commit
-from src.tag import (
-    get_user_choice,
-    tag_version,
-    get_repo_root,
-    update_changelog,
-)
-from src.create_project import simple_project_init
-from src.git_init import (
-    prompt_for_origin,
-    init_git_repo,
-)
+# The menu actions (and GitPython behind them) are imported when they are
+# first chosen, so the first screen is drawn without loading them
 
 logger = setup_logging()
 
-def main():
+def render_repository_menu(repo, branch_name, latest_tag, fetch_scheduler, live=None):
+    try:
+        if live is not None:
+            # Watch mode: only the parts that changed since the last frame are read again
+            comparison_result = live.refresh()
+            latest_tag = live.latest_tag
+        else:
+            comparison_result = compare_with_origin(repo, branch_name)
+        print_repository_info(repo, branch_name, latest_tag)
+        print_fetch_state(get_last_fetch_age(repo), fetch_scheduler.is_running, fetch_scheduler.last_error)
+        print_status(comparison_result)
+        if STATUS_CACHE_ENABLED and comparison_result.error is None:
+            save_status_snapshot(repo, branch_name, latest_tag, comparison_result, get_origin_url(repo))
+    except Exception as e:
+        logger.error(f"Error comparing with origin: {e}")
+        show_error(f"Error comparing with origin: {e}")
+    log_options()
+    log_separator()
+
+def build_menu_frame(repo, branch_name, latest_tag, fetch_scheduler, trace_mark=None, live=None):
+    """Return the whole menu screen as one string, ready to be drawn."""
+    with capture_output() as frame:
+        display_title(PROGRAM_TITLE, PROGRAM_AUTHOR, PROGRAM_HELP_TEXT, PROGRAM_VERSION, PROGRAM_DATE)
+        render_repository_menu(repo, branch_name, latest_tag, fetch_scheduler, live)
+        tracer = get_tracer()
+        if tracer and trace_mark is not None:
+            # The git commands behind this refresh, including a background fetch
+            print_trace_summary(tracer.since(trace_mark))
+            log_separator()
+    return frame.getvalue()
+
+def build_cached_frame(snapshot, fetch_scheduler):
+    """Return the menu as the last run saw it, drawn before the repository is opened."""
+    with capture_output() as frame:
+        display_title(PROGRAM_TITLE, PROGRAM_AUTHOR, PROGRAM_HELP_TEXT, PROGRAM_VERSION, PROGRAM_DATE)
+        print_repository_details(snapshot.remote_url, snapshot.working_dir, snapshot.branch, snapshot.latest_tag)
+        # The repository is being read and origin fetched in the background
+        print_fetch_state(get_fetch_head_age(snapshot.git_dir), True, fetch_scheduler.last_error)
+        print_status(snapshot.status)
+        log_options()
+        log_separator()
+    return frame.getvalue()
+
+def main(plain=None, watch=False):
+    # Each screen is drawn as a single frame; redraws only rewrite the lines
+    # that changed, and plain mode writes frames without colour or cursor moves
+    screen = ScreenRenderer(plain=plain)
+    if screen.plain:
+        use_plain_output()
+
+    # Remote refs are refreshed in the background; when a fetch finishes while
+    # the menu is waiting for input, the screen is redrawn with the new state
+    fetch_scheduler = FetchScheduler()
+    waiting_for_choice = threading.Event()
+    render_lock = threading.Lock()
+    force_fetch = False
+
+    def make_redraw(repo, branch_name, latest_tag, trace_mark, live=None):
+        def redraw(show_prompt=True):
+            with render_lock:
+                if not waiting_for_choice.is_set():
+                    return
+                frame = build_menu_frame(repo, branch_name, latest_tag, fetch_scheduler, trace_mark, live)
+                # In place, only the changed lines are rewritten and the cursor
+                # stays at the prompt; after a full redraw the prompt is shown again
+                if not screen.draw(frame, keep_cursor=show_prompt) and show_prompt:
+                    print(CHOICE_PROMPT, end='', flush=True)
+        return redraw
+
+    # With watch, changes to files, the index or refs mark the parts of the
+    # status they affect and redraw the menu while it waits for a choice
+    watcher = None
+    watched = {}
+
+    def on_watched_change(parts):
+        live, redraw = watched.get('live'), watched.get('redraw')
+        if live is None:
+            return
+        live.invalidate(parts)
+        try:
+            redraw()
+        except Exception as e:
+            # Runs on the watcher's thread: an error must not stop the watching
+            logger.error(f"{ERROR_TEXT}Error redrawing the menu: {e}{RESET_TEXT}")
+
+    def prepare_menu(repo, branch_name, latest_tag, trace_mark):
+        """Return the redraw function for this repository, and its LiveStatus in watch mode."""
+        nonlocal watcher
+        live = None
+        if watch:
+            from src.repo_watch import LiveStatus, start_watcher
+            live = LiveStatus(repo, branch_name)
+            if watcher is None:
+                # Our own `git status` must not rewrite the index, or every refresh would trigger the next
+                os.environ['GIT_OPTIONAL_LOCKS'] = '0'
+                watcher = start_watcher(repo, on_watched_change)
+        redraw = make_redraw(repo, branch_name, latest_tag, trace_mark, live)
+        watched.update(live=live, redraw=redraw)
+        return redraw, live
+
+    # While HEAD, the index and the refs are as the last run left them, the
+    # first screen is drawn from the status cache at once; the repository is
+    # then read in the background and the screen updated in place
+    snapshot = load_status_snapshot(os.getcwd()) if STATUS_CACHE_ENABLED else None
+
     while True:
         # Ensure these are always initialized at the start of each loop
         error_message = None
         warning_message = None
 
-        clear_screen()
-        display_title(PROGRAM_TITLE, PROGRAM_AUTHOR, PROGRAM_HELP_TEXT, PROGRAM_VERSION, PROGRAM_DATE)
+        tracer = get_tracer()
+        trace_mark = tracer.mark() if tracer else None
+        loader = None
+        loaded = {}
+        rendered_while_fetching = False
+        if snapshot is not None:
+            with render_lock:
+                screen.draw(build_cached_frame(snapshot, fetch_scheduler))
+            snapshot = None
 
-        repo, branch_name, latest_tag = initialize_repository()
-        if repo is None:
-            show_warning("You are not in a Git repository. Only project creation and repository initialization are available.")
-            log_separator()
-            print(f"{OUTPUT_TEXT}1. Create a new Git Project{RESET_TEXT}")
-            print(f"{OUTPUT_TEXT}2. Initialize a new Git Repository{RESET_TEXT}")
-            print(f"{OUTPUT_TEXT}x. Exit the application{RESET_TEXT}")
+            def load_repository(trace_mark=trace_mark):
+                result = (None, None, None)
+                try:
+                    result = initialize_repository()
+                    repo, branch_name, latest_tag = result
+                    if repo is not None:
+                        loaded['redraw'], _ = prepare_menu(repo, branch_name, latest_tag, trace_mark)
+                        fetch_scheduler.request(repo, branch_name, on_complete=loaded['redraw'])
+                except Exception as e:
+                    # Raised again on the main thread once it needs the repository
+                    loaded['error'] = e
+                finally:
+                    with render_lock:
+                        loaded['result'] = result
+                        draw_now = waiting_for_choice.is_set()
+                if draw_now and 'redraw' in loaded and 'error' not in loaded:
+                    loaded['redraw']()
+
+            loader = threading.Thread(target=load_repository, name='load-repository', daemon=True)
+            loader.start()
+        else:
+            repo, branch_name, latest_tag = initialize_repository()
+
+        if loader is None and repo is None:
+            with capture_output() as frame:
+                display_title(PROGRAM_TITLE, PROGRAM_AUTHOR, PROGRAM_HELP_TEXT, PROGRAM_VERSION, PROGRAM_DATE)
+                show_warning("You are not in a Git repository. Only project creation and repository initialization are available.")
+                log_separator()
+                print(f"{OUTPUT_TEXT}1. Create a new Git Project{RESET_TEXT}")
+                print(f"{OUTPUT_TEXT}2. Initialize a new Git Repository{RESET_TEXT}")
+                print(f"{OUTPUT_TEXT}x. Exit the application{RESET_TEXT}")
+            screen.draw(frame.getvalue())
             choice = input(f"\n{QUESTION_TEXT}Enter your choice: {RESET_TEXT}").strip()
+            screen.invalidate()
             if choice == '1':
+                from src.create_project import simple_project_init
                 simple_project_init()
                 prompt_to_continue()
             elif choice == '2':
@@ -86,6 +218,7 @@ def main():
                     show_error(f"Directory '{local_path}' does not exist.")
                     prompt_to_continue()
                     continue
+                from src.git_init import prompt_for_origin, init_git_repo
                 origin_url = prompt_for_origin()
                 init_git_repo(local_path, origin_url)
                 prompt_to_continue()
@@ -97,16 +230,13 @@ def main():
                 prompt_to_continue()
             continue
 
-        # Repo is valid, show full menu
-        print_repository_info(repo, branch_name, latest_tag)
-        try:
-            comparison_result = compare_with_origin(repo, branch_name)
-            print_status(comparison_result)
-        except Exception as e:
-            logger.error(f"Error comparing with origin: {e}")
-            show_error(f"Error comparing with origin: {e}")
-        log_options()
-        log_separator()
+        if loader is None:
+            # Repo is valid, show full menu
+            redraw_after_fetch, live = prepare_menu(repo, branch_name, latest_tag, trace_mark)
+            with render_lock:
+                fetch_scheduler.request(repo, branch_name, on_complete=redraw_after_fetch, force=force_fetch)
+                screen.draw(build_menu_frame(repo, branch_name, latest_tag, fetch_scheduler, trace_mark, live))
+                rendered_while_fetching = fetch_scheduler.is_running
 
         if warning_message:
             show_warning(warning_message)
@@ -118,31 +248,69 @@ def main():
             logger.error(error_message)
             error_message = None
 
+        with render_lock:
+            waiting_for_choice.set()
+            # The repository was read before we started waiting, so it has not been drawn yet
+            loaded_before_waiting = 'result' in loaded
+        if loaded_before_waiting and 'redraw' in loaded and 'error' not in loaded:
+            loaded['redraw'](show_prompt=False)
+        elif loader is None and ((rendered_while_fetching and not fetch_scheduler.is_running)
+                                 or (live is not None and live.is_stale)):
+            # The fetch finished, or something changed, before we started waiting, so redraw now
+            redraw_after_fetch(show_prompt=False)
         choice = get_user_choice()
+        waiting_for_choice.clear()
+        # Let a redraw that is already in progress finish before acting
+        with render_lock:
+            pass
+
+        if loader is not None:
+            # The actions need the repository the cached screen stood in for
+            loader.join()
+            if 'error' in loaded:
+                raise loaded['error']
+            repo, branch_name, latest_tag = loaded['result']
+            if repo is None:
+                continue
+
+        force_fetch = False
         if choice == UserChoice.REFRESH.value[0]:
-            repo, branch_name, latest_tag = initialize_repository()
+            # The loop re-reads the repository; the fetch runs in the background.
+            # The menu is still on screen, so the next frame only redraws what changed
+            force_fetch = True
+            continue
 
-        elif choice == UserChoice.PULL.value[0]:
+        # Every other choice writes its own output below the menu
+        screen.invalidate()
+        if choice == UserChoice.PULL.value[0]:
+            # A background fetch that is still running is reused by the pull
+            fetch_scheduler.wait()
+            from src.git_pull import git_pull
             git_pull(repo, branch_name)
             prompt_to_continue()
 
         elif choice == UserChoice.PUSH.value[0]:
+            from src.git_push import git_push
             git_push(repo, branch_name)
             prompt_to_continue()
 
         elif choice == UserChoice.ADD.value[0]:
+            from src.git_add import git_add
             git_add(repo)
             prompt_to_continue()
 
         elif choice == UserChoice.COMMIT.value[0]:
+            from src.git_commit import git_commit
             git_commit(repo)
             prompt_to_continue()
 
         elif choice == UserChoice.TAG.value[0]:
-            tag_version(repo, latest_tag)
+            from src.tag import tag_version
+            tag_version(repo)
             prompt_to_continue()
 
         elif choice == UserChoice.CREATE.value[0]:
+            from src.create_project import simple_project_init
             simple_project_init()
             prompt_to_continue()
 
@@ -152,6 +320,7 @@ def main():
                 show_error(f"Directory '{local_path}' does not exist.")
                 prompt_to_continue()
                 continue
+            from src.git_init import prompt_for_origin, init_git_repo
             origin_url = prompt_for_origin()
             init_git_repo(local_path, origin_url)
             prompt_to_continue()
@@ -160,5 +329,23 @@ def main():
             logger.info("Exiting the application. Goodbye!")
             break
 
+def run():
+    """Entry point: the interactive menu, or a single command when one is given."""
+    from src.cli import build_parser, run_command
+    args = build_parser().parse_args()
+    if args.trace:
+        from src.trace import enable_tracing
+        enable_tracing(args.trace)
+    if args.command is None:
+        main(plain=args.plain or None, watch=args.watch)
+    else:
+        if args.plain:
+            from src.screen import use_plain_output
+            use_plain_output()
+        exit_code = run_command(args)
+        if args.trace:
+            print_trace_summary(get_tracer().spans, sys.stderr)
+        sys.exit(exit_code)
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    run()
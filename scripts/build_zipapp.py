@@ -0,0 +1,51 @@
+# build_zipapp.py
+"""
+Build git-helper as a single runnable zipapp.
+
+    python scripts/build_zipapp.py                  # dist/git-helper.pyz, needs GitPython and semver installed
+    python scripts/build_zipapp.py --bundle-deps    # also bundles GitPython and semver
+
+Run the result with `python dist/git-helper.pyz`, with or without a command.
+"""
+import os
+import sys
+import shutil
+import zipapp
+import argparse
+import tempfile
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Pure-Python runtime dependencies, safe to bundle into the archive
+RUNTIME_DEPENDENCIES = ['GitPython', 'semver']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default=os.path.join(REPO_ROOT, 'dist', 'git-helper.pyz'), help='archive to write')
+    parser.add_argument('--bundle-deps', action='store_true', help='include GitPython and semver in the archive')
+    parser.add_argument('--python', default='/usr/bin/env python3', help='interpreter line for the archive')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as staging:
+        shutil.copy2(os.path.join(REPO_ROOT, 'main.py'), staging)
+        shutil.copytree(
+            os.path.join(REPO_ROOT, 'src'), os.path.join(staging, 'src'),
+            ignore=shutil.ignore_patterns('__pycache__', '*.pyc', 'git-helper-broken.py'),
+        )
+        if args.bundle_deps:
+            subprocess.run(
+                [sys.executable, '-m', 'pip', 'install', '--quiet', '--no-compile',
+                 '--target', staging, *RUNTIME_DEPENDENCIES],
+                check=True,
+            )
+
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        zipapp.create_archive(staging, args.output, interpreter=args.python, main='main:run')
+
+    print(f"Built {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# check_startup.py
+"""
+Fail when starting git-helper gets slower or loads heavy modules eagerly.
+
+Imports main.py under `python -X importtime` several times and checks that:
+  - the best cumulative import time of main stays within the budget
+  - GitPython and semver are not imported before they are needed
+
+Run from the repository root (exits non-zero on a regression):
+
+    python scripts/check_startup.py --budget-ms 100
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be loaded lazily, inside the functions that use them
+LAZY_MODULES = ('git', 'gitdb', 'semver')
+
+
+def measure_import(module):
+    """Return (cumulative microseconds, set of imported module names) for one cold import."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    cumulative = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative = int(cumulative_us)
+    return cumulative, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=100.0, help='allowed import time of main.py')
+    parser.add_argument('--runs', type=int, default=5, help='imports to take the best time from')
+    args = parser.parse_args()
+
+    best_us = None
+    eager = set()
+    for _ in range(args.runs):
+        cumulative_us, imported = measure_import('main')
+        best_us = cumulative_us if best_us is None else min(best_us, cumulative_us)
+        eager |= {name for name in imported if name.split('.')[0] in LAZY_MODULES}
+
+    best_ms = best_us / 1000
+    print(f"main.py import time: {best_ms:.1f} ms (budget {args.budget_ms:.1f} ms)")
+
+    failed = False
+    if best_ms > args.budget_ms:
+        print(f"FAIL: startup is {best_ms - args.budget_ms:.1f} ms over budget")
+        failed = True
+    if eager:
+        print(f"FAIL: imported at startup, should be lazy: {', '.join(sorted(eager))}")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+# bulk_sync.py
+import os
+import sys
+import time
+import signal
+import asyncio
+
+from src.git_fetch import get_fetch_args, get_background_env
+from src.git_errors import classify_git_error, TIMEOUT, NOT_FAST_FORWARD, NO_REMOTE_BRANCH
+from src.workspace import discover_repositories
+from src.trace import get_tracer, find_caller
+from src.config import SYNC_JOBS, SYNC_TIMEOUT_SECONDS, WORKSPACE_MAX_DEPTH
+
+# Outcomes of syncing one repository
+UPDATED = 'updated'        # Fast-forwarded to origin
+UP_TO_DATE = 'up-to-date'  # Nothing new on origin
+FETCHED = 'fetched'        # Fetch only: remote-tracking ref refreshed
+SKIPPED = 'skipped'        # Left alone, e.g. detached HEAD or diverged branch
+FAILED = 'failed'
+
+class SyncResult:
+    """What happened to one repository during a bulk fetch or pull."""
+    __slots__ = ('path', 'name', 'branch', 'outcome', 'error_kind', 'detail', 'ahead', 'behind', 'seconds')
+
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+        self.branch = None
+        self.outcome = None
+        self.error_kind = None  # One of the git_errors kinds when outcome is FAILED
+        self.detail = ''
+        self.ahead = None
+        self.behind = None
+        self.seconds = 0.0
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+class GitFailed(Exception):
+    def __init__(self, args, returncode, stderr):
+        super().__init__(stderr.strip() or f"git {' '.join(args)} exited with {returncode}")
+        self.returncode = returncode
+
+def _first_error_line(message):
+    """Return the line of git's stderr that says what went wrong."""
+    lines = [line.strip() for line in message.splitlines() if line.strip()]
+    for line in lines:
+        if line.startswith(('fatal:', 'error:')):
+            return line
+    return lines[0] if lines else ''
+
+def _kill(process):
+    # git runs ssh or upload-pack as children, so stop the whole process group
+    if os.name == 'posix':
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    else:
+        process.kill()
+
+# --- Run git without blocking the event loop --- #
+async def run_git(path, *args, env=None):
+    """Run git in path and return its stdout; raise GitFailed if it fails."""
+    tracer = get_tracer()
+    started = time.perf_counter()
+    process = await asyncio.create_subprocess_exec(
+        'git', *args, cwd=path, env=env,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=os.name == 'posix',
+    )
+    stdout = stderr = b''
+    try:
+        stdout, stderr = await process.communicate()
+    except asyncio.CancelledError:
+        # Timed out or interrupted: do not leave git running in the background
+        _kill(process)
+        await process.wait()
+        raise
+    finally:
+        if tracer:
+            # Repositories are synced side by side, so each gets its own timeline row
+            tracer.record(
+                ['git', *args], started, time.perf_counter() - started, len(stdout) + len(stderr),
+                thread=os.path.basename(path), caller=find_caller(sys._getframe(1)),
+            )
+    if process.returncode:
+        raise GitFailed(args, process.returncode, stderr.decode(errors='replace'))
+    return stdout.decode(errors='replace')
+
+# --- Fetch or fast-forward one repository --- #
+async def sync_repository(result, pull, env):
+    """Fetch origin/<branch> for result.path and, with pull, fast-forward the branch to it."""
+    path = result.path
+    try:
+        result.branch = (await run_git(path, 'symbolic-ref', '--quiet', '--short', 'HEAD', env=env)).strip()
+    except GitFailed:
+        result.outcome, result.detail = SKIPPED, 'detached HEAD'
+        return
+
+    try:
+        await run_git(path, *get_fetch_args(result.branch), env=env)
+    except GitFailed as e:
+        if classify_git_error(e) != NO_REMOTE_BRANCH:
+            raise
+        # A branch that was never pushed has nothing to fetch or pull
+        result.outcome, result.error_kind = SKIPPED, NO_REMOTE_BRANCH
+        result.detail = 'not on origin yet'
+        return
+    counts = await run_git(path, 'rev-list', '--left-right', '--count', f'{result.branch}...origin/{result.branch}', env=env)
+    result.ahead, result.behind = (int(count) for count in counts.split())
+
+    if not pull:
+        result.outcome = FETCHED
+    elif not result.behind:
+        result.outcome = UP_TO_DATE
+    elif result.ahead:
+        # A bulk pull only fast-forwards; merging or rebasing needs a person
+        result.outcome, result.error_kind = SKIPPED, NOT_FAST_FORWARD
+        result.detail = f'diverged ({result.ahead} ahead, {result.behind} behind)'
+    else:
+        await run_git(path, 'merge', '--ff-only', '--quiet', f'origin/{result.branch}', env=env)
+        result.outcome = UPDATED
+        result.detail = f'{result.behind} new commits'
+
+async def _sync_one(path, root, pull, semaphore, timeout, env):
+    result = SyncResult(path, os.path.relpath(path, root))
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(sync_repository(result, pull, env), timeout)
+        except asyncio.TimeoutError:
+            result.outcome, result.error_kind = FAILED, TIMEOUT
+            result.detail = f'timed out after {timeout}s'
+        except Exception as e:
+            result.outcome, result.error_kind = FAILED, classify_git_error(e)
+            result.detail = _first_error_line(str(e)) or type(e).__name__
+        result.seconds = time.perf_counter() - started
+    return result
+
+async def sync_repositories(paths, root, pull=False, jobs=SYNC_JOBS, timeout=SYNC_TIMEOUT_SECONDS, on_result=None):
+    """
+    Sync every path with at most jobs git processes running at once.
+
+    on_result(result, done, total) is called as each repository finishes.
+    Returns the results in path order.
+    """
+    semaphore = asyncio.Semaphore(max(1, jobs))
+    # Never wait for a password or host key prompt nobody will see
+    env = get_background_env()
+    tasks = [asyncio.ensure_future(_sync_one(path, root, pull, semaphore, timeout, env)) for path in paths]
+    done = 0
+    for finished in asyncio.as_completed(tasks):
+        result = await finished
+        done += 1
+        if on_result:
+            on_result(result, done, len(tasks))
+    return [task.result() for task in tasks]
+
+# --- Fetch or pull every repository under a directory --- #
+def sync_workspace(root, pull=False, jobs=SYNC_JOBS, timeout=SYNC_TIMEOUT_SECONDS, on_result=None, match=None):
+    """
+    Fetch (or, with pull, fetch and fast-forward) every repository under root.
+
+    Diverged branches are skipped rather than merged, and one repository
+    failing or timing out does not stop the others.
+    """
+    root = os.path.abspath(root)
+    paths = discover_repositories(root, WORKSPACE_MAX_DEPTH)
+    if match:
+        paths = [path for path in paths if match.lower() in os.path.relpath(path, root).lower()]
+    if not paths:
+        return []
+    return asyncio.run(sync_repositories(paths, root, pull, jobs, timeout, on_result))
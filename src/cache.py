@@ -0,0 +1,56 @@
+# cache.py
+import os
+import json
+import tempfile
+
+CACHE_DIR_NAME = 'git-helper'
+
+# --- Locate the cache directory inside .git --- #
+def get_cache_dir(repo):
+    """Return (and create) the git-helper cache directory inside the repository's .git."""
+    cache_dir = os.path.join(repo.common_dir, CACHE_DIR_NAME)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+# --- Read and write JSON cache files --- #
+def read_cache_file(path):
+    """Return the decoded JSON in path, or None if it is missing or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_cache_file(path, data):
+    """Atomically replace path with data encoded as JSON."""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temp_path, path)
+    except OSError:
+        # A cache that cannot be written is simply rebuilt next time
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+# --- Cheap fingerprints of files and directories --- #
+def stat_signature(path):
+    """Return [mtime_ns, size] for path, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+def tree_signature(root):
+    """
+    Return the modification times of root and every directory below it.
+
+    Adding, removing or atomically rewriting a file changes the mtime of the
+    directory that holds it, so this catches changes without reading files.
+    """
+    signature = []
+    for dirpath, dirnames, _ in os.walk(root):
+        dirnames.sort()
+        signature.append([os.path.relpath(dirpath, root), os.stat(dirpath).st_mtime_ns])
+    return signature
@@ -0,0 +1,383 @@
+# cli.py
+import sys
+import argparse
+
+from src.config import PROGRAM_TITLE, PROGRAM_HELP_TEXT, PROGRAM_VERSION
+
+# --- Command line arguments --- #
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='git-helper',
+        description=f"{PROGRAM_TITLE} - {PROGRAM_HELP_TEXT}. Run without a command for the interactive menu.",
+    )
+    parser.add_argument('--version', action='version', version=f"%(prog)s {PROGRAM_VERSION}")
+    parser.add_argument(
+        '--plain', action='store_true',
+        help='no colours or cursor movement (also used when NO_COLOR is set or TERM=dumb)'
+    )
+    parser.add_argument(
+        '--trace', metavar='FILE',
+        help='record every git command and write the timeline to FILE as Chrome-trace JSON'
+    )
+    parser.add_argument(
+        '--watch', action='store_true',
+        help='menu only: redraw the menu as soon as files, the index or refs change'
+    )
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+
+    status_parser = subparsers.add_parser('status', help='show branch, tag and working tree status')
+    status_parser.add_argument(
+        '--format', choices=['ansi', 'plain', 'json', 'count'], default='ansi',
+        help='output format (default: the coloured report from the menu)'
+    )
+    status_parser.add_argument(
+        '--json', dest='format', action='store_const', const='json', help='same as --format json'
+    )
+    status_parser.add_argument('--fetch', action='store_true', help='fetch from origin before comparing')
+    status_parser.add_argument(
+        '--no-daemon', action='store_true', help='read the repository in this process even if a daemon is running'
+    )
+
+    watch_parser = subparsers.add_parser('watch', help='show the status and update it as files, the index and refs change')
+    watch_parser.add_argument('--no-fetch', action='store_true', help='do not fetch from origin in the background')
+
+    daemon_parser = subparsers.add_parser(
+        'daemon', help='keep repositories open in a background process so status answers in milliseconds'
+    )
+    daemon_parser.add_argument(
+        'action', choices=['start', 'stop', 'status', 'run'],
+        help='run serves in the foreground; start runs it in the background'
+    )
+
+    subparsers.add_parser('pull', help='pull changes from origin')
+    subparsers.add_parser('push', help='push unpushed commits to origin')
+
+    add_parser = subparsers.add_parser('add', help='stage files')
+    add_parser.add_argument('paths', nargs='*', help='files to stage')
+    add_parser.add_argument('--all', action='store_true', help='stage every new and modified file')
+
+    commit_parser = subparsers.add_parser('commit', help='commit staged changes')
+    commit_parser.add_argument('-m', '--message', required=True, help='single-line commit message')
+
+    tag_parser = subparsers.add_parser('tag', help='tag a new version, update the changelog and push')
+    tag_parser.add_argument('bump', choices=['major', 'minor', 'patch'], help='which part of the version to increment')
+    tag_parser.add_argument('--changes', default='', help="changelog notes, separate multiple changes with ';'")
+
+    workspace_parser = subparsers.add_parser('workspace', help='summarise every repository under a directory')
+    workspace_parser.add_argument('root', nargs='?', default='.', help='directory to search (default: current directory)')
+    workspace_parser.add_argument(
+        '--sort', choices=['name', 'branch', 'tag', 'ahead', 'behind', 'dirty', 'time'], default='name',
+        help='column to sort by (counts sort largest first)'
+    )
+    workspace_parser.add_argument(
+        '--filter', dest='state', default='all',
+        choices=['all', 'attention', 'dirty', 'ahead', 'behind', 'diverged', 'conflicted', 'error'],
+        help='only show repositories in this state'
+    )
+    workspace_parser.add_argument('--match', help='only show repositories whose path contains this text')
+    workspace_parser.add_argument('--jobs', type=int, default=None, help='repositories to read at the same time')
+    workspace_parser.add_argument('--json', action='store_true', help='write the table as JSON')
+
+    sync_parser = subparsers.add_parser('sync', help='fetch, or fast-forward pull, every repository under a directory')
+    sync_parser.add_argument('root', nargs='?', default='.', help='directory to search (default: current directory)')
+    sync_parser.add_argument('--pull', action='store_true', help='fast-forward each branch after fetching')
+    sync_parser.add_argument('--match', help='only sync repositories whose path contains this text')
+    sync_parser.add_argument('--jobs', type=int, default=None, help='repositories to sync at the same time')
+    sync_parser.add_argument('--timeout', type=float, default=None, help='seconds before a repository is given up on')
+    sync_parser.add_argument('--json', action='store_true', help='write the results as JSON instead of progress')
+
+    return parser
+
+# --- Bulk fetch/pull --- #
+def run_sync(args):
+    import json
+    import time
+    from src.bulk_sync import sync_workspace, FAILED
+    from src.display import SyncProgress
+    from src.screen import is_plain_terminal
+    from src.config import SYNC_JOBS, SYNC_TIMEOUT_SECONDS
+
+    progress = None if args.json else SyncProgress(sys.stdout, live=not is_plain_terminal())
+    started = time.perf_counter()
+    results = sync_workspace(
+        args.root, pull=args.pull,
+        jobs=args.jobs or SYNC_JOBS, timeout=args.timeout or SYNC_TIMEOUT_SECONDS,
+        on_result=progress, match=args.match,
+    )
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        json.dump({'results': [result.to_dict() for result in results], 'seconds': elapsed}, sys.stdout)
+        sys.stdout.write("\n")
+    else:
+        progress.finish(len(results), elapsed)
+    if not results:
+        return 1
+    return 1 if any(result.outcome == FAILED for result in results) else 0
+
+# --- Workspace dashboard --- #
+def run_workspace(args):
+    import time
+    from src.workspace import collect_workspace, select_summaries
+    from src.display import render_workspace_table, render_workspace_json
+    from src.config import WORKSPACE_JOBS
+
+    started = time.perf_counter()
+    summaries = collect_workspace(args.root, jobs=args.jobs or WORKSPACE_JOBS)
+    elapsed = time.perf_counter() - started
+
+    selected = select_summaries(summaries, sort=args.sort, state=args.state, match=args.match)
+    render = render_workspace_json if args.json else render_workspace_table
+    render(selected, sys.stdout, total=len(summaries), elapsed=elapsed)
+    return 0 if summaries else 1
+
+# --- Status without the remote comparison details --- #
+def collect_status(repo, branch_name, latest_tag):
+    """Return a RepoStatus with ahead/behind against origin/<branch_name> and the latest tag."""
+    from src.git_status import get_repo_status
+    from src.revisions import count_ahead_behind
+
+    status = get_repo_status(repo)
+    status.latest_tag = latest_tag
+    if status.upstream != f'origin/{branch_name}':
+        try:
+            status.ahead, status.behind = count_ahead_behind(repo, branch_name, f'origin/{branch_name}')
+        except Exception:
+            # No origin/<branch> to compare with
+            status.ahead = status.behind = None
+    return status
+
+def summarize_status(status):
+    """Reduce a full comparison with origin (as compare_with_origin returns it) to what collect_status reports."""
+    if status.error and status.upstream != f'origin/{status.branch}':
+        status.ahead = status.behind = None
+    status.files_to_pull, status.commits_to_push, status.error = [], [], None
+    return status
+
+# --- Status from the daemon --- #
+def status_from_daemon(args):
+    """
+    Print the status as the daemon reports it and return the exit code, or
+    None when no daemon is running (or it failed) and the caller should read
+    the repository itself.
+    """
+    import os
+    from src.daemon_client import call, DaemonUnavailable, DaemonError, NOT_A_REPOSITORY
+    from src.git_status import RepoStatus
+
+    try:
+        result = call('status', path=os.getcwd(), fetch=args.fetch)
+    except DaemonUnavailable:
+        return None
+    except DaemonError as e:
+        if e.code == NOT_A_REPOSITORY:
+            from src.utils import setup_logging
+            from src.config import ERROR_TEXT, RESET_TEXT
+            setup_logging().error(f"{ERROR_TEXT}Not inside a Git repository.{RESET_TEXT}")
+            return 2
+        return None
+
+    status = RepoStatus.from_dict(result['status'])
+    if args.format == 'ansi':
+        from src.display import print_repository_details, print_status
+        print_repository_details(result['remote_url'], result['working_dir'], result['branch'], result['latest_tag'])
+        print_status(status)
+    else:
+        from src.display import STATUS_RENDERERS
+        STATUS_RENDERERS[args.format](summarize_status(status), sys.stdout)
+    return 0
+
+# --- Manage the daemon --- #
+def daemon_command():
+    """Return the command line that runs the daemon in the foreground."""
+    import os
+    if getattr(sys, 'frozen', False):
+        # The packaged binary
+        return [sys.executable, 'daemon', 'run']
+    return [sys.executable, os.path.abspath(sys.argv[0]), 'daemon', 'run']
+
+def run_daemon_action(action):
+    import os
+    import time
+    import subprocess
+    from src.daemon_client import call, is_running, check_socket_dir, get_socket_path, DaemonUnavailable, UnsafeSocketDir
+    from src.display import print_daemon_stats
+    from src.utils import setup_logging
+    from src.config import ERROR_TEXT, OUTPUT_TEXT, RESET_TEXT
+
+    logger = setup_logging()
+    if action == 'run':
+        from src.daemon import run_daemon
+        return run_daemon()
+
+    if action == 'start':
+        if is_running():
+            logger.info(f"{OUTPUT_TEXT}The daemon is already running on {get_socket_path()}{RESET_TEXT}")
+            return 0
+        try:
+            socket_dir = check_socket_dir(create=True)
+        except UnsafeSocketDir as e:
+            logger.error(f"{ERROR_TEXT}Refusing to start the daemon: {e}{RESET_TEXT}")
+            return 1
+        log_path = os.path.join(socket_dir, 'daemon.log')
+        with open(log_path, 'ab') as log:
+            process = subprocess.Popen(
+                daemon_command(), stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True,
+            )
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if is_running():
+                logger.info(f"{OUTPUT_TEXT}Daemon started (pid {process.pid}) on {get_socket_path()}{RESET_TEXT}")
+                return 0
+            if process.poll() is not None:
+                break
+            time.sleep(0.02)
+        logger.error(f"{ERROR_TEXT}The daemon did not start; see {log_path}{RESET_TEXT}")
+        return 1
+
+    try:
+        if action == 'stop':
+            call('shutdown', timeout=5)
+            # Wait until it has let go of the socket, so that a new daemon can be started straight away
+            deadline = time.monotonic() + 5
+            while os.path.exists(get_socket_path()) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            logger.info(f"{OUTPUT_TEXT}Daemon stopped.{RESET_TEXT}")
+            return 0
+        print_daemon_stats(call('stats', timeout=5), get_socket_path())
+        return 0
+    except DaemonUnavailable:
+        logger.info(f"{OUTPUT_TEXT}The daemon is not running.{RESET_TEXT}")
+        return 0 if action == 'stop' else 1
+
+# --- Live status screen --- #
+def run_watch(repo, branch_name, args):
+    """Show the status and redraw it whenever the repository changes, until Ctrl-C."""
+    import os
+    import threading
+    from src.repo_watch import LiveStatus, start_watcher, REMOTE
+    from src.git_fetch import FetchScheduler, get_last_fetch_age
+    from src.screen import ScreenRenderer, capture_output
+    from src.display import print_repository_details, print_fetch_state, print_status, print_watch_footer, show_error
+    from src.config import FETCH_TTL_SECONDS
+
+    # Our own `git status` must not rewrite the index, or every refresh would trigger the next
+    os.environ['GIT_OPTIONAL_LOCKS'] = '0'
+
+    live = LiveStatus(repo, branch_name, follow_head=True)
+    changed = threading.Event()
+
+    def on_change(parts):
+        live.invalidate(parts)
+        changed.set()
+
+    watcher = start_watcher(repo, on_change)
+    fetch_scheduler = None if args.no_fetch else FetchScheduler()
+    screen = ScreenRenderer()
+    try:
+        while True:
+            changed.clear()
+            if fetch_scheduler:
+                # Does nothing until the last fetch is older than the TTL
+                fetch_scheduler.request(repo, live.branch_name, on_complete=lambda: on_change({REMOTE}))
+            with capture_output() as frame:
+                try:
+                    status = live.refresh()
+                    print_repository_details(live.remote_url, repo.working_tree_dir, live.branch_name, live.latest_tag)
+                    if fetch_scheduler:
+                        print_fetch_state(get_last_fetch_age(repo), fetch_scheduler.is_running, fetch_scheduler.last_error)
+                    print_status(status)
+                except Exception as e:
+                    # Shown until the next change; the parts that failed are read again then
+                    show_error(f"Error reading the repository: {e}")
+                print()
+                print_watch_footer(watcher.describe(), live.last_refresh)
+            screen.draw(frame.getvalue())
+            changed.wait(FETCH_TTL_SECONDS if fetch_scheduler else None)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.stop()
+
+# --- Run a subcommand --- #
+def run_command(args):
+    """Run the subcommand in args and return the process exit code."""
+    from src.utils import initialize_repository, setup_logging
+    from src.config import ERROR_TEXT, RESET_TEXT
+
+    logger = setup_logging()
+    if args.command == 'daemon':
+        return run_daemon_action(args.action)
+    if args.command == 'status' and not args.no_daemon:
+        # Answered by the daemon when one is running, without loading GitPython here
+        exit_code = status_from_daemon(args)
+        if exit_code is not None:
+            return exit_code
+    if args.command == 'workspace':
+        # Works on the repositories under a directory, not the current one
+        return run_workspace(args)
+    if args.command == 'sync':
+        return run_sync(args)
+
+    repo, branch_name, latest_tag = initialize_repository()
+    if repo is None:
+        logger.error(f"{ERROR_TEXT}Not inside a Git repository.{RESET_TEXT}")
+        return 2
+
+    if args.command == 'status':
+        if args.fetch:
+            from git import exc
+            from src.git_fetch import fetch_origin
+            try:
+                fetch_origin(repo, branch_name)
+            except exc.GitCommandError as e:
+                logger.error(f"{ERROR_TEXT}Error fetching from the origin: {e}{RESET_TEXT}")
+                return 1
+        if args.format == 'ansi':
+            from src.display import print_repository_info, print_status
+            from src.utils import compare_with_origin
+            print_repository_info(repo, branch_name, latest_tag)
+            print_status(compare_with_origin(repo, branch_name))
+        else:
+            from src.display import STATUS_RENDERERS
+            STATUS_RENDERERS[args.format](collect_status(repo, branch_name, latest_tag), sys.stdout)
+        return 0
+
+    if args.command == 'watch':
+        return run_watch(repo, branch_name, args)
+
+    if args.command == 'pull':
+        from src.git_pull import git_pull
+        return 0 if git_pull(repo, branch_name) else 1
+
+    if args.command == 'push':
+        from src.git_push import git_push
+        return 0 if git_push(repo, branch_name) else 1
+
+    if args.command == 'add':
+        if args.all:
+            from git import exc
+            try:
+                repo.git.add('-A')
+            except exc.GitCommandError as e:
+                logger.error(f"{ERROR_TEXT}Error adding files: {e}{RESET_TEXT}")
+                return 1
+            return 0
+        if not args.paths:
+            logger.error(f"{ERROR_TEXT}Give the files to stage, or --all.{RESET_TEXT}")
+            return 1
+        import os
+        from src.git_add import stage_files
+        # git runs at the top of the working tree, but the paths are relative to where the user is
+        paths = [os.path.relpath(os.path.abspath(path), repo.working_tree_dir) for path in args.paths]
+        return 0 if len(stage_files(repo, paths)) == len(set(paths)) else 1
+
+    if args.command == 'commit':
+        from src.git_commit import commit_staged
+        return 0 if commit_staged(repo, args.message) else 1
+
+    if args.command == 'tag':
+        from src.tag import tag_version
+        return 0 if tag_version(repo, bump=args.bump, changes=args.changes) else 1
+
+    return 1
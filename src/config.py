@@ -1,3 +1,5 @@
+import os
+
 # ANSI escape codes for text colors and reset
 BOLD_TEXT = '\033[1m'
 UNDERLINE_TEXT = '\033[4m'
@@ -27,6 +29,57 @@ def print_section_header(text, color=BOLD_TEXT):
     print(f"{color}{text.center(line_length)}{RESET_TEXT}")
     print(f"{color}{'=' * line_length}{RESET_TEXT}")
 
+# Display limits
+MAX_COMMITS_DISPLAYED = 20  # Commits listed in the status before summarising the rest
+STAGING_TREE_THRESHOLD = 50  # More files than this are offered for staging grouped by directory
+
+# Background fetch
+# Remote-tracking refs older than this many seconds are refreshed in the background
+FETCH_TTL_SECONDS = int(os.environ.get('GIT_HELPER_FETCH_TTL', '60'))
+# 'branch' fetches only the active branch from origin, 'full' fetches every ref
+FETCH_MODE = os.environ.get('GIT_HELPER_FETCH_MODE', 'branch')
+# Pull reuses a fetch made by this session within this many seconds
+PULL_FETCH_REUSE_SECONDS = int(os.environ.get('GIT_HELPER_PULL_FETCH_REUSE', '30'))
+
+# Changelog
+# Largest diff (in bytes) written into a changelog entry before falling back to a diffstat
+CHANGELOG_DIFF_MAX_BYTES = int(os.environ.get('GIT_HELPER_CHANGELOG_DIFF_LIMIT', str(1024 * 1024)))
+CHANGELOG_COPY_CHUNK_BYTES = 1024 * 1024
+# Commits listed per conventional-commit type in the release notes
+RELEASE_NOTES_MAX_PER_GROUP = 100
+
+# Workspace dashboard
+# Repositories summarised at the same time, and how deep to look for them under the root
+WORKSPACE_JOBS = int(os.environ.get('GIT_HELPER_WORKSPACE_JOBS', '16'))
+WORKSPACE_MAX_DEPTH = 3
+# Bulk sync: git processes run at once, and seconds before one repository is given up on
+SYNC_JOBS = int(os.environ.get('GIT_HELPER_SYNC_JOBS', '8'))
+SYNC_TIMEOUT_SECONDS = int(os.environ.get('GIT_HELPER_SYNC_TIMEOUT', '120'))
+
+# Status cache
+# The first screen is drawn from the status saved by the last run while HEAD,
+# the index and the refs are unchanged; set GIT_HELPER_STATUS_CACHE=0 to turn this off
+STATUS_CACHE_ENABLED = os.environ.get('GIT_HELPER_STATUS_CACHE', '1') not in ('', '0')
+
+# Watch mode
+# Changes are shown once no new ones have arrived for this many milliseconds
+WATCH_DEBOUNCE_MS = int(os.environ.get('GIT_HELPER_WATCH_DEBOUNCE', '50'))
+# Without inotify (not Linux), .git is checked this often instead
+WATCH_POLL_SECONDS = 2
+
+# Background daemon
+# Unix socket the daemon listens on (default: $XDG_RUNTIME_DIR/git-helper/daemon.sock)
+DAEMON_SOCKET = os.environ.get('GIT_HELPER_DAEMON_SOCKET', '')
+# The daemon exits after this many seconds without a request (0: never)
+DAEMON_IDLE_SECONDS = int(os.environ.get('GIT_HELPER_DAEMON_IDLE', '3600'))
+# Repositories kept open at once; the least recently used one is closed first
+DAEMON_MAX_REPOS = 32
+
+# Screen output
+# Set GIT_HELPER_PLAIN=1 for output without colours or cursor movement
+# (also used when NO_COLOR is set, TERM=dumb or stdout is not a terminal)
+PLAIN_OUTPUT = os.environ.get('GIT_HELPER_PLAIN', '') not in ('', '0')
+
 # Program metadata
 PROGRAM_TITLE = "Git Helper"
 PROGRAM_AUTHOR = "Neil Grinnall"
@@ -0,0 +1,267 @@
+# daemon.py
+import os
+import sys
+import json
+import time
+import signal
+import inspect
+import threading
+import socketserver
+from collections import OrderedDict
+
+from src.utils import setup_logging
+from src.status_cache import find_git_dirs, read_head
+from src.repo_watch import LiveStatus, RepositoryWatcher, watch_key, changed_parts, TREE, REMOTE
+from src.daemon_client import (
+    check_socket_dir, get_socket_path, is_running, UnsafeSocketDir,
+    PARSE_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, INVALID_PARAMS, SERVER_ERROR, NOT_A_REPOSITORY,
+)
+from src.config import DAEMON_IDLE_SECONDS, DAEMON_MAX_REPOS, PROGRAM_VERSION
+
+logger = setup_logging()
+
+class NotARepository(Exception):
+    pass
+
+# --- One open repository --- #
+class RepositoryHandle:
+    """A Repo kept open by the daemon, with its status and the watcher that invalidates it."""
+    __slots__ = ('working_dir', 'git_dir', 'common_dir', 'repo', 'live', 'watcher', 'key', 'lock', 'requests')
+
+    def __init__(self, working_dir, git_dir, common_dir):
+        from git import Repo
+
+        self.working_dir = working_dir
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self.repo = Repo(working_dir)
+        self.live = LiveStatus(self.repo, read_head(git_dir, common_dir)[0], follow_head=True)
+        self.key = watch_key(git_dir, common_dir)
+        self.lock = threading.Lock()
+        self.requests = 0
+        warm_object_readers(self.repo)
+        try:
+            self.watcher = RepositoryWatcher(working_dir, git_dir, common_dir, self.live.invalidate).start()
+        except OSError:
+            # No inotify here, or no watches left: the working tree is read on every request
+            self.watcher = None
+
+    def status(self):
+        """Return the current status as a dict, re-reading only what changed since the last request."""
+        with self.lock:
+            self.requests += 1
+            # The watcher may not have reported a change made just before this
+            # request yet (it waits for the debounce time), so .git is checked too
+            key = watch_key(self.git_dir, self.common_dir)
+            self.live.invalidate(changed_parts(self.key, key))
+            self.key = key
+            if self.watcher is None:
+                self.live.invalidate({TREE})
+            if key['branch'] is None:
+                raise NotARepository("HEAD is detached")
+            status = self.live.refresh()
+            return {
+                'working_dir': self.working_dir,
+                'remote_url': self.live.remote_url,
+                'branch': self.live.branch_name,
+                'latest_tag': self.live.latest_tag,
+                'status': status.to_dict(),
+                'parts_read': sorted(self.live.last_refresh),
+            }
+
+    def describe(self):
+        return {
+            'working_dir': self.working_dir,
+            'branch': self.live.branch_name,
+            'watcher': self.watcher.describe() if self.watcher else "none; the working tree is read on every request",
+            'requests': self.requests,
+        }
+
+    def close(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+        # Ends the cat-file processes
+        self.repo.close()
+
+def warm_object_readers(repo):
+    """Start GitPython's persistent `git cat-file --batch` and `--batch-check` processes."""
+    try:
+        head = repo.head.commit
+        head.summary
+        repo.odb.info(head.binsha)
+    except ValueError:
+        # No commits yet
+        pass
+
+# --- Requests --- #
+class StatusDaemon:
+    """
+    Answers JSON-RPC requests from git-helper clients.
+
+    Each repository asked about is opened once and kept, with a watcher,
+    until DAEMON_MAX_REPOS others have been used more recently. A status
+    request then costs only the git calls for the parts that changed.
+    """
+
+    def __init__(self, max_repos=DAEMON_MAX_REPOS):
+        self.max_repos = max_repos
+        self.handles = OrderedDict()  # working_dir -> RepositoryHandle, least recently used first
+        self.started = time.time()
+        self.last_request = time.monotonic()
+        self.requests = 0
+        self.server = None
+        self._lock = threading.Lock()
+
+    def get_handle(self, path):
+        dirs = find_git_dirs(path)
+        if dirs is None:
+            raise NotARepository(f"Not inside a Git repository: {path}")
+        working_dir = dirs[0]
+        with self._lock:
+            handle = self.handles.get(working_dir)
+            if handle is not None:
+                self.handles.move_to_end(working_dir)
+                return handle
+        handle = RepositoryHandle(*dirs)
+        evicted = []
+        with self._lock:
+            if working_dir in self.handles:
+                # Another request opened it meanwhile
+                evicted.append(handle)
+                handle = self.handles[working_dir]
+            else:
+                self.handles[working_dir] = handle
+                while len(self.handles) > self.max_repos:
+                    evicted.append(self.handles.popitem(last=False)[1])
+        for old in evicted:
+            old.close()
+        return handle
+
+    def rpc_ping(self):
+        return {'pid': os.getpid(), 'version': PROGRAM_VERSION}
+
+    def rpc_status(self, path, fetch=False):
+        handle = self.get_handle(path)
+        if fetch:
+            from src.git_fetch import fetch_origin
+            with handle.lock:
+                fetch_origin(handle.repo, handle.live.branch_name)
+                handle.live.invalidate({REMOTE})
+        return handle.status()
+
+    def rpc_stats(self):
+        with self._lock:
+            handles = list(self.handles.values())
+        return {
+            'pid': os.getpid(),
+            'version': PROGRAM_VERSION,
+            'uptime': time.time() - self.started,
+            'requests': self.requests,
+            'repositories': [handle.describe() for handle in reversed(handles)],
+        }
+
+    def rpc_shutdown(self):
+        # Stop after this answer has been sent
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+        return True
+
+    def dispatch(self, line):
+        """Return the JSON-RPC response for one request line."""
+        self.last_request = time.monotonic()
+        self.requests += 1
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return _error(None, PARSE_ERROR, f"Invalid JSON: {e}")
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return _error(None, INVALID_REQUEST, "Expected an object with a method")
+        request_id = request.get('id')
+        params = request.get('params') or {}
+        method = getattr(self, f"rpc_{request['method']}", None)
+        if method is None:
+            return _error(request_id, METHOD_NOT_FOUND, f"Unknown method: {request['method']}")
+        try:
+            inspect.signature(method).bind(**params)
+        except TypeError as e:
+            return _error(request_id, INVALID_PARAMS, str(e))
+        try:
+            result = method(**params)
+        except NotARepository as e:
+            return _error(request_id, NOT_A_REPOSITORY, str(e))
+        except Exception as e:
+            logger.error(f"{request['method']} failed: {e}")
+            return _error(request_id, SERVER_ERROR, str(e))
+        return {'jsonrpc': '2.0', 'id': request_id, 'result': result}
+
+    def close(self):
+        with self._lock:
+            handles, self.handles = list(self.handles.values()), OrderedDict()
+        for handle in handles:
+            handle.close()
+
+def _error(request_id, code, message):
+    return {'jsonrpc': '2.0', 'id': request_id, 'error': {'code': code, 'message': message}}
+
+# --- The socket server --- #
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON request per line and writes one JSON response per line."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            response = self.server.status_daemon.dispatch(line)
+            self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+def _stop_when_idle(daemon, idle_seconds, stopped):
+    while not stopped.wait(min(60, idle_seconds)):
+        if time.monotonic() - daemon.last_request >= idle_seconds:
+            logger.info(f"No requests for {idle_seconds}s, stopping")
+            daemon.server.shutdown()
+            return
+
+def run_daemon(idle_seconds=DAEMON_IDLE_SECONDS):
+    """Serve requests on the socket until stopped. Returns the exit code."""
+    socket_path = get_socket_path()
+    if is_running():
+        logger.error(f"A daemon is already listening on {socket_path}")
+        return 1
+    try:
+        check_socket_dir(create=True)
+    except UnsafeSocketDir as e:
+        logger.error(f"Refusing to listen on {socket_path}: {e}")
+        return 1
+    if os.path.exists(socket_path):
+        # Left behind by a daemon that did not stop cleanly
+        os.remove(socket_path)
+
+    # Our own `git status` must not rewrite the index, or every refresh would trigger the next
+    os.environ['GIT_OPTIONAL_LOCKS'] = '0'
+    daemon = StatusDaemon()
+    old_umask = os.umask(0o177)
+    try:
+        server = _Server(socket_path, _RequestHandler)
+    finally:
+        os.umask(old_umask)
+    server.status_daemon = daemon
+    daemon.server = server
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    stopped = threading.Event()
+    if idle_seconds:
+        threading.Thread(target=_stop_when_idle, args=(daemon, idle_seconds, stopped), daemon=True).start()
+    logger.info(f"git-helper daemon {PROGRAM_VERSION} (pid {os.getpid()}) listening on {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopped.set()
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        daemon.close()
+    return 0
@@ -0,0 +1,101 @@
+# daemon_client.py
+import os
+import json
+import stat
+import socket
+import tempfile
+
+from src.config import DAEMON_SOCKET
+
+# JSON-RPC 2.0 error codes, plus our own in the server error range
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+NOT_A_REPOSITORY = -32001
+
+CALL_TIMEOUT_SECONDS = 30
+
+class DaemonUnavailable(OSError):
+    """No daemon is listening, or it stopped answering."""
+
+class UnsafeSocketDir(DaemonUnavailable):
+    """The socket directory could have been set up by another user."""
+
+class DaemonError(Exception):
+    """The daemon answered with a JSON-RPC error."""
+
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.code = code
+
+# --- Where the daemon listens --- #
+def get_socket_dir():
+    """Return the per-user directory for the socket and the daemon's log."""
+    if DAEMON_SOCKET:
+        return os.path.dirname(os.path.abspath(DAEMON_SOCKET))
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'git-helper')
+    return os.path.join(tempfile.gettempdir(), f'git-helper-{os.getuid()}')
+
+def get_socket_path():
+    if DAEMON_SOCKET:
+        return os.path.abspath(DAEMON_SOCKET)
+    return os.path.join(get_socket_dir(), 'daemon.sock')
+
+def check_socket_dir(create=False):
+    """
+    Return the socket directory, or raise UnsafeSocketDir unless only this user can use it.
+
+    In the temporary directory another user could have made it first and put
+    their own socket there, so it must be a real directory, owned by us, mode 0700.
+    """
+    socket_dir = get_socket_dir()
+    if create:
+        os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    info = os.lstat(socket_dir)
+    if not stat.S_ISDIR(info.st_mode):
+        raise UnsafeSocketDir(f"{socket_dir} is not a directory")
+    if info.st_uid != os.getuid():
+        raise UnsafeSocketDir(f"{socket_dir} belongs to another user")
+    if stat.S_IMODE(info.st_mode) != 0o700:
+        raise UnsafeSocketDir(f"{socket_dir} has mode {stat.S_IMODE(info.st_mode):o}, expected 700")
+    return socket_dir
+
+# --- Call the daemon --- #
+def call(method, timeout=CALL_TIMEOUT_SECONDS, **params):
+    """
+    Send one JSON-RPC request to the daemon and return its result.
+
+    Raises DaemonUnavailable when no daemon is running or its socket
+    directory is not safe (so the caller can do the work itself) and
+    DaemonError when the daemon reports an error.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        raise DaemonUnavailable("Unix sockets are not available on this system")
+    request = {'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params}
+    try:
+        check_socket_dir()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(timeout)
+            connection.connect(get_socket_path())
+            connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            with connection.makefile('rb') as reader:
+                reply = reader.readline()
+    except OSError as e:
+        raise DaemonUnavailable(f"The daemon is not running: {e}")
+    if not reply:
+        raise DaemonUnavailable("The daemon closed the connection")
+    response = json.loads(reply)
+    if 'error' in response:
+        raise DaemonError(response['error']['message'], response['error']['code'])
+    return response['result']
+
+def is_running():
+    try:
+        call('ping', timeout=1)
+    except (DaemonUnavailable, DaemonError, ValueError):
+        return False
+    return True
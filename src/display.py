@@ -1,13 +1,18 @@
 import os
+import sys
+import json
 from enum import Enum
 import re
 
 from src.utils import ( 
     get_org_and_repo_name,
+    get_origin_url,
     get_uncommitted_changes,
     compare_with_origin
 )
 
+from src.screen import CLEAR_SCREEN, is_plain_terminal
+
 from src.config import (
     BOLD_TEXT,
     UNDERLINE_TEXT,
@@ -38,7 +43,10 @@ class UserChoice(Enum):
     EXIT = ('x', 'Exit the application')
 
 def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    # ANSI sequences instead of starting a shell to run clear/cls
+    if not is_plain_terminal():
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
 
 def display_title(title, author, help_text, version, date):
     max_length = max(
@@ -77,27 +85,351 @@ def show_error(message):
 def show_warning(message):
     print(f"{WARNING_TEXT}Warning: {message}{RESET_TEXT}")
 
+CHOICE_PROMPT = f"\n{QUESTION_TEXT}Enter the number of your choice: {RESET_TEXT}"
+
 def get_user_choice():
     while True:
-        choice = input(f"\n{QUESTION_TEXT}Enter the number of your choice: {RESET_TEXT}")
+        choice = input(CHOICE_PROMPT)
         if choice not in [option.value[0] for option in UserChoice]:
             print(f"{ERROR_TEXT}Invalid choice. Please try again.{RESET_TEXT}")
         else:
             return choice
 
 def print_repository_info(repo, branch_name, latest_tag):
-    remote_url = repo.remotes.origin.url
+    print_repository_details(get_origin_url(repo), repo.working_tree_dir, branch_name, latest_tag)
+
+def print_repository_details(remote_url, working_dir, branch_name, latest_tag):
     org_name, repo_name = get_org_and_repo_name(remote_url)
-    
+
     print_section_header("Repository Information", color=WARNING_TEXT)
-    print(f"{OUTPUT_TEXT}Origin:            {ANSWER_TEXT}{remote_url}{RESET_TEXT}")
+    print(f"{OUTPUT_TEXT}Origin:            {ANSWER_TEXT}{remote_url or 'No origin remote'}{RESET_TEXT}")
     print(f"{OUTPUT_TEXT}Organization/User: {ANSWER_TEXT}{org_name}{RESET_TEXT}")
     print(f"{OUTPUT_TEXT}Repository Name:   {ANSWER_TEXT}{repo_name}{RESET_TEXT}")
-    print(f"{OUTPUT_TEXT}Working Directory: {ANSWER_TEXT}{repo.working_tree_dir}{RESET_TEXT}")
+    print(f"{OUTPUT_TEXT}Working Directory: {ANSWER_TEXT}{working_dir}{RESET_TEXT}")
     print(f"{OUTPUT_TEXT}Active Branch:     {ANSWER_TEXT}{branch_name}{RESET_TEXT}")
-    print(f"{OUTPUT_TEXT}Latest Tag:        {ANSWER_TEXT}{latest_tag}{RESET_TEXT}\n")
+    print(f"{OUTPUT_TEXT}Latest Tag:        {ANSWER_TEXT}{latest_tag or 'No tags available'}{RESET_TEXT}\n")
+
+
+def format_age(seconds):
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 86400)}d"
+
+def print_fetch_state(last_fetch_age, refreshing, error=None):
+    if last_fetch_age is None:
+        state = "Remote status: origin has not been fetched yet"
+    else:
+        state = f"Remote status: origin last fetched {format_age(last_fetch_age)} ago"
+    if refreshing:
+        state += " (updating in the background...)"
+    print(f"{HELP_TEXT}{state}{RESET_TEXT}")
+    if error:
+        print(f"{WARNING_TEXT}Background fetch failed: {error}{RESET_TEXT}")
+
+# --- Status renderers --- #
+# Each renderer takes a RepoStatus and writes it to a stream line by line,
+# so even very long file lists are never built up as one string
+
+def iter_status_lines(status):
+    """Yield the coloured status report, one line at a time."""
+    branch_name = status.branch
+
+    if status.error:
+        # The working tree changes were read before the comparison failed
+        yield f"{ERROR_TEXT}{status.error}{RESET_TEXT}"
+        yield from iter_uncommitted_lines(status)
+        return
+
+    # A branch that was never pushed has nothing on origin to compare with
+    if status.ahead is None and status.behind is None:
+        yield ""
+        yield f"{ANSWER_TEXT}{UNDERLINE_TEXT}Local branch {branch_name} is not on the origin yet.{RESET_TEXT}"
+        yield ""
+        yield f"{HELP_TEXT}Guidance: Consider {WARNING_TEXT}(2.)PUSHING{RESET_TEXT}{HELP_TEXT} the branch to the remote repository.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    Pushing creates the branch on the origin and sets it as the upstream.{RESET_TEXT}"
+        yield ""
+
+    # If the local branch is behind, show the number and guidance
+    if status.behind:
+        yield ""
+        yield f"{ANSWER_TEXT}{UNDERLINE_TEXT}Local branch {branch_name} is behind the remote origin by {status.behind} commits.{RESET_TEXT}"
+        yield f"{ANSWER_TEXT}Files on remote to be pulled:{RESET_TEXT}"
+        for file in status.files_to_pull:
+            yield f"{OUTPUT_TEXT}  - {file}{RESET_TEXT}"
+        yield ""
+        yield f"{HELP_TEXT}Guidance: Consider {WARNING_TEXT}(1.)PULLING{RESET_TEXT}{HELP_TEXT} the changes from the remote repository.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    Files exist on the remote repository that you do not have locally.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    Pulling the files will update your local copy of the repository to match the remote one.{RESET_TEXT}"
+        yield ""
+
+    # If the local branch is ahead, show the commits and guidance
+    if status.ahead:
+        yield ""
+        yield f"{ANSWER_TEXT}{UNDERLINE_TEXT}Local branch {branch_name} is ahead of the remote origin by {status.ahead} commits.{RESET_TEXT}"
+        yield f"{ANSWER_TEXT}Commits waiting to be pushed:{RESET_TEXT}"
+        for short_sha, author, summary in status.commits_to_push:
+            yield f"{OUTPUT_TEXT}{short_sha} - {author}: {summary}{RESET_TEXT}"
+        hidden = status.ahead - len(status.commits_to_push)
+        if status.commits_to_push and hidden > 0:
+            yield f"{OUTPUT_TEXT}... and {hidden} more commits{RESET_TEXT}"
+        yield ""
+        yield f"{HELP_TEXT}Guidance: Consider {WARNING_TEXT}(2.)PUSHING{RESET_TEXT}{HELP_TEXT} your commits to synchronize with the remote repository.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    Files exist on the local repository that do not exist on the remote one.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    Pushing the files will update the remote repository to match the local one.{RESET_TEXT}"
+        yield ""
+
+    yield from iter_uncommitted_lines(status)
+
+def iter_uncommitted_lines(status):
+    """Yield the coloured report of conflicted, staged, unstaged and untracked files."""
+    conflicted_files = status.conflicted
+    if conflicted_files:
+        yield ""
+        yield f"{ANSWER_TEXT}{UNDERLINE_TEXT}Files with merge conflicts:{RESET_TEXT}"
+        for entry in conflicted_files:
+            yield f"{OUTPUT_TEXT}  Conflicted: {entry.path}{RESET_TEXT}"
+        yield ""
+        yield f"{HELP_TEXT}Guidance: Resolve the conflicts, then {WARNING_TEXT}(3.)ADD{RESET_TEXT}{HELP_TEXT} and {WARNING_TEXT}(4.)COMMIT{RESET_TEXT}{HELP_TEXT} the files.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    These files contain conflict markers from a merge that could not be completed automatically.{RESET_TEXT}"
+        yield ""
+
+    staged_files = status.staged
+    if staged_files:
+        yield ""
+        yield f"{ANSWER_TEXT}{UNDERLINE_TEXT}Changes ready to be committed:{RESET_TEXT}"
+        for entry in staged_files:
+            if entry.original_path is not None:
+                yield f"{OUTPUT_TEXT}  Renamed (staged): {entry.original_path} -> {entry.path}{RESET_TEXT}"
+            else:
+                yield f"{OUTPUT_TEXT}  Modified (staged): {entry.path}{RESET_TEXT}"
+        yield ""
+        yield f"{HELP_TEXT}Guidance: Consider {WARNING_TEXT}(4.)COMMITTING{RESET_TEXT} your changes.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    These files have been added to the staging area and are ready for your next commit.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    You shouldn't change these files any further until you commit them.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    Once committed, these files can be pushed to the origin repository.{RESET_TEXT}"
+        yield ""
+
+    unstaged_files = status.unstaged
+    if unstaged_files:
+        yield ""
+        yield f"{ANSWER_TEXT}{UNDERLINE_TEXT}Files not yet added to staging:{RESET_TEXT}"
+        for entry in unstaged_files:
+            yield f"{OUTPUT_TEXT}  Modified (not staged): {entry.path}{RESET_TEXT}"
+        yield ""
+        yield f"{HELP_TEXT}Guidance: Consider {WARNING_TEXT}(3.)ADDING{RESET_TEXT} the changed files to staging.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    These files have been changed since the last commit, but are not yet staged.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    Only add files that are ready to be staged and then committed to the repository.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    When added, the files will be staged and ready to commit.{RESET_TEXT}"
+        yield ""
+
+    untracked_files = status.untracked
+    if untracked_files:
+        yield ""
+        yield f"{ANSWER_TEXT}{UNDERLINE_TEXT}Untracked files not yet added to staging:{RESET_TEXT}"
+        for entry in untracked_files:
+            yield f"{OUTPUT_TEXT}  New file (untracked): {entry.path}{RESET_TEXT}"
+        yield ""
+        yield f"{HELP_TEXT}Guidance: Consider {WARNING_TEXT}(3.)ADDING{RESET_TEXT} the new files to staging.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    These files are recognized by Git, but are not yet part of version control.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    Only add files that are ready to be staged and then committed to the repository.{RESET_TEXT}"
+        yield f"{HELP_TEXT}>    When added, the files will be staged and ready to commit.{RESET_TEXT}"
+        yield ""
+
+def render_status_plain(status, stream):
+    """Write one 'XY path' line per file, like `git status --short`, without colour."""
+    stream.write(f"## {status.branch or '(detached)'}")
+    if status.upstream:
+        stream.write(f"...{status.upstream} [ahead {status.ahead}, behind {status.behind}]")
+    stream.write("\n")
+    if status.error:
+        stream.write(f"error: {status.error}\n")
+    for entry in status.entries:
+        state = 'UU' if entry.conflicted else f"{entry.index_state}{entry.worktree_state}".replace('.', ' ')
+        if entry.original_path is not None:
+            stream.write(f"{state} {entry.original_path} -> {entry.path}\n")
+        else:
+            stream.write(f"{state} {entry.path}\n")
+
+def render_status_json(status, stream):
+    """Write the status as a single JSON document."""
+    json.dump(status.to_dict(), stream)
+    stream.write("\n")
+
+def render_status_counts(status, stream):
+    """Write a one-line summary, e.g. for a shell prompt."""
+    counts = status.counts()
+    ahead = '?' if status.ahead is None else status.ahead
+    behind = '?' if status.behind is None else status.behind
+    stream.write(
+        f"{status.branch or '(detached)'} +{ahead} -{behind} "
+        f"staged:{counts['staged']} unstaged:{counts['unstaged']} "
+        f"untracked:{counts['untracked']} conflicted:{counts['conflicted']}\n"
+    )
+
+def render_status_ansi(status, stream):
+    """Write the coloured report used by the interactive menu."""
+    for line in iter_status_lines(status):
+        stream.write(line)
+        stream.write("\n")
+
+STATUS_RENDERERS = {
+    'ansi': render_status_ansi,
+    'plain': render_status_plain,
+    'json': render_status_json,
+    'count': render_status_counts,
+}
+
+# --- Workspace table --- #
+WORKSPACE_COLUMNS = ['Repository', 'Branch', 'Tag', 'Ahead', 'Behind', 'Staged', 'Unstaged', 'Untracked', 'Conflicts']
+
+def _workspace_row(summary):
+    """Return the cells of one row and the colour for each cell."""
+    def count(value, color):
+        if value is None:
+            return '-', HELP_TEXT
+        return str(value), color if value else HELP_TEXT
+
+    if summary.error:
+        message = summary.error.splitlines()[0]
+        return [(summary.name, ERROR_TEXT), (f"error: {message}", ERROR_TEXT)]
+    return [
+        (summary.name, OUTPUT_TEXT),
+        (summary.branch or '(detached)', ANSWER_TEXT),
+        (summary.latest_tag or '-', OUTPUT_TEXT),
+        count(summary.ahead, WARNING_TEXT),
+        count(summary.behind, WARNING_TEXT),
+        count(summary.staged, ANSWER_TEXT),
+        count(summary.unstaged, WARNING_TEXT),
+        count(summary.untracked, WARNING_TEXT),
+        count(summary.conflicted, ERROR_TEXT),
+    ]
+
+def render_workspace_table(summaries, stream, total=None, elapsed=None):
+    """Write the workspace summaries as an aligned, coloured table."""
+    rows = [_workspace_row(summary) for summary in summaries]
+    widths = [len(title) for title in WORKSPACE_COLUMNS]
+    for row in rows:
+        # An error message runs across the remaining columns, so it is not measured
+        for column, (text, _) in enumerate(row[:1] if len(row) == 2 else row):
+            widths[column] = max(widths[column], len(text))
+
+    def cell(column, text):
+        # Names and branches line up on the left, counts on the right
+        return text.ljust(widths[column]) if column < 3 else text.rjust(widths[column])
+
+    header = '  '.join(cell(column, title) for column, title in enumerate(WORKSPACE_COLUMNS))
+    stream.write(f"{BOLD_TEXT}{header}{RESET_TEXT}\n")
+    for row in rows:
+        stream.write('  '.join(f"{color}{cell(column, text)}{RESET_TEXT}" for column, (text, color) in enumerate(row)))
+        stream.write("\n")
+
+    if total is not None:
+        shown = f"{len(summaries)} of {total}" if len(summaries) != total else f"{total}"
+        timing = f" in {elapsed:.2f}s" if elapsed is not None else ""
+        stream.write(f"{HELP_TEXT}{shown} repositories{timing}{RESET_TEXT}\n")
+
+def render_workspace_json(summaries, stream, total=None, elapsed=None):
+    """Write the workspace summaries as a single JSON document."""
+    json.dump({
+        'repositories': [summary.to_dict() for summary in summaries],
+        'total': total,
+        'seconds': elapsed,
+    }, stream)
+    stream.write("\n")
+
+# --- Bulk sync progress --- #
+SYNC_OUTCOME_COLORS = {
+    'updated': ANSWER_TEXT,
+    'up-to-date': HELP_TEXT,
+    'fetched': HELP_TEXT,
+    'skipped': WARNING_TEXT,
+    'failed': ERROR_TEXT,
+}
+
+def format_sync_result(result):
+    color = SYNC_OUTCOME_COLORS.get(result.outcome, OUTPUT_TEXT)
+    detail = f" - {result.detail}" if result.detail else ""
+    kind = f" [{result.error_kind}]" if result.error_kind else ""
+    return f"{color}{result.outcome:<10}{RESET_TEXT} {OUTPUT_TEXT}{result.name}{RESET_TEXT}{color}{kind}{detail}{RESET_TEXT}"
+
+class SyncProgress:
+    """
+    Reports repositories as they finish a bulk sync.
+
+    On a terminal the last line is a running count that is rewritten in
+    place, and only repositories that changed or need attention get a line
+    of their own. Otherwise every repository is listed.
+    """
+
+    def __init__(self, stream, live):
+        self.stream = stream
+        self.live = live
+        self.counts = {}
+
+    def __call__(self, result, done, total):
+        self.counts[result.outcome] = self.counts.get(result.outcome, 0) + 1
+        output = '\r\033[K' if self.live else ''
+        if not self.live or result.outcome in ('updated', 'skipped', 'failed'):
+            output += format_sync_result(result) + '\n'
+        if self.live:
+            summary = ', '.join(f"{outcome} {count}" for outcome, count in sorted(self.counts.items()))
+            output += f"{HELP_TEXT}[{done}/{total}] {summary}{RESET_TEXT}"
+        self.stream.write(output)
+        self.stream.flush()
+
+    def finish(self, total, elapsed):
+        summary = ', '.join(f"{outcome} {count}" for outcome, count in sorted(self.counts.items()))
+        clear = '\r\033[K' if self.live else ''
+        self.stream.write(f"{clear}{BOLD_TEXT}{total} repositories in {elapsed:.2f}s: {summary or 'nothing to do'}{RESET_TEXT}\n")
+
+# --- Git command trace --- #
+TRACE_SUMMARY_ROWS = 15
+
+def print_trace_summary(spans, stream=None):
+    """Write the slowest git commands in spans, with who ran them and how much they printed."""
+    stream = stream or sys.stdout
+    timed = [span for span in spans if span.duration is not None]
+    total_ms = sum(span.duration for span in timed) * 1000
+    network_ms = sum(span.duration for span in timed if span.category == 'network') * 1000
+    stream.write(
+        f"{HELP_TEXT}Git commands: {len(spans)} run, {total_ms:.1f} ms in total "
+        f"({network_ms:.1f} ms on the network){RESET_TEXT}\n"
+    )
+    if not timed:
+        return
+    stream.write(f"{HELP_TEXT}{'ms':>9} {'bytes':>9}  {'caller':<36} command{RESET_TEXT}\n")
+    slowest = sorted(timed, key=lambda span: span.duration, reverse=True)
+    for span in slowest[:TRACE_SUMMARY_ROWS]:
+        color = WARNING_TEXT if span.category == 'network' else HELP_TEXT
+        command = span.command if len(span.command) <= 60 else span.command[:57] + '...'
+        stream.write(
+            f"{color}{span.duration * 1000:>9.1f} {span.bytes_read:>9}  {span.caller[-36:]:<36} {command}{RESET_TEXT}\n"
+        )
+    if len(slowest) > TRACE_SUMMARY_ROWS:
+        stream.write(f"{HELP_TEXT}... and {len(slowest) - TRACE_SUMMARY_ROWS} faster commands{RESET_TEXT}\n")
+
+def print_watch_footer(watching, last_refresh):
+    """The last lines of the watch screen: how changes are noticed and what the last redraw re-read."""
+    print(f"{HELP_TEXT}Watching for changes ({watching}). Press Ctrl-C to stop.{RESET_TEXT}")
+    if last_refresh:
+        parts = ', '.join(f"{part} {seconds * 1000:.0f} ms" for part, seconds in last_refresh.items())
+        print(f"{HELP_TEXT}Last update re-read: {parts}{RESET_TEXT}")
 
+def print_daemon_stats(stats, socket_path):
+    """What `daemon status` shows: the daemon itself, then each repository it holds open."""
+    print_section_header("Daemon", color=WARNING_TEXT)
+    print(f"{OUTPUT_TEXT}Socket:            {ANSWER_TEXT}{socket_path}{RESET_TEXT}")
+    print(f"{OUTPUT_TEXT}Process:           {ANSWER_TEXT}pid {stats['pid']}, version {stats['version']}, up {format_age(stats['uptime'])}{RESET_TEXT}")
+    print(f"{OUTPUT_TEXT}Requests served:   {ANSWER_TEXT}{stats['requests']}{RESET_TEXT}")
+    print(f"{OUTPUT_TEXT}Repositories open: {ANSWER_TEXT}{len(stats['repositories'])}{RESET_TEXT}")
+    for repository in stats['repositories']:
+        print(f"  {ANSWER_TEXT}{repository['working_dir']}{RESET_TEXT} "
+              f"{HELP_TEXT}({repository['branch']}, {repository['requests']} requests; watcher: {repository['watcher']}){RESET_TEXT}")
 
-def print_status(comparison_result):
+def print_status(status):
     print_section_header("Differences between local and origin", color=WARNING_TEXT)
-    print(comparison_result)
\ No newline at end of file
+    render_status_ansi(status, sys.stdout)
\ No newline at end of file
@@ -0,0 +1,122 @@
+# fs_watch.py
+import os
+import sys
+import errno
+import struct
+import ctypes
+import ctypes.util
+
+# Event bits from <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+
+# A file was written and closed, created, deleted, renamed or had its mode
+# changed. IN_MODIFY is left out, as it fires for every write() call
+CHANGE_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW | IN_EXCL_UNLINK
+)
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+_READ_BYTES = 64 * 1024
+
+_libc = None
+
+class InotifyUnavailable(OSError):
+    """inotify cannot be used here: not Linux, or the kernel refused."""
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return _libc
+
+class Inotify:
+    """
+    Directory watches through Linux's inotify, using ctypes.
+
+    Each watch reports changes to the entries of one directory, not below
+    it; callers add a watch for every directory they care about. read()
+    never blocks, so fileno() can be passed to select().
+    """
+
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise InotifyUnavailable(errno.ENOSYS, "inotify is only available on Linux")
+        try:
+            libc = _load_libc()
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            raise InotifyUnavailable(errno.ENOSYS, f"inotify is not available: {e}")
+        if fd < 0:
+            code = ctypes.get_errno()
+            raise InotifyUnavailable(code, f"inotify_init1 failed: {os.strerror(code)}")
+        self._fd = fd
+        self._directories = {}  # watch descriptor -> directory path
+
+    def fileno(self):
+        return self._fd
+
+    def add_directory(self, path):
+        """
+        Watch path's entries. Returns False if the directory is gone or
+        unreadable; raises OSError when the per-user watch limit is reached.
+        """
+        wd = _load_libc().inotify_add_watch(self._fd, os.fsencode(path), CHANGE_MASK)
+        if wd < 0:
+            code = ctypes.get_errno()
+            if code in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                return False
+            if code == errno.ENOSPC:
+                raise OSError(code, "inotify watch limit reached; raise fs.inotify.max_user_watches")
+            raise OSError(code, f"inotify_add_watch {path}: {os.strerror(code)}")
+        self._directories[wd] = path
+        return True
+
+    def __len__(self):
+        return len(self._directories)
+
+    def read(self):
+        """
+        Return the events waiting to be read as (directory, name, mask).
+
+        name is '' for events on the directory itself. An overflowed queue is
+        reported as (None, '', IN_Q_OVERFLOW): events were lost.
+        """
+        events = []
+        while True:
+            try:
+                data = os.read(self._fd, _READ_BYTES)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    events.append((None, '', mask))
+                elif mask & IN_IGNORED:
+                    # The watch was removed, e.g. because the directory was deleted
+                    self._directories.pop(wd, None)
+                elif wd in self._directories:
+                    events.append((self._directories[wd], name, mask))
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
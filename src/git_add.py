@@ -1,10 +1,14 @@
 # git_add.py
+import os
+import re
+import tempfile
 
-from git import Repo, exc
 from src.utils import (
     setup_logging,
     get_uncommitted_changes,
 )
+from src.git_status import get_repo_status
+from src.path_tree import PathTree, is_under, minimal_pathspecs
 
 from src.config import (
     BOLD_TEXT,
@@ -22,12 +26,60 @@ from src.config import (
     PROGRAM_HELP_TEXT,
     PROGRAM_VERSION,
     PROGRAM_DATE,
+    STAGING_TREE_THRESHOLD,
 )
 
 logger = setup_logging()
 
+# git stops at the first path that does not exist and names it
+PATHSPEC_NOT_MATCHED = re.compile(r"pathspec '(.+?)' did not match any files")
 
 
+# --- Stage the given files --- #
+def stage_files(repo, files):
+    """
+    Add files to the staging area with one `git add` and return the ones that were added.
+
+    If the batch fails because a path does not exist, that path is reported
+    and the rest retried. Any other failure splits the batch in half until the
+    files that cannot be added are on their own, each with its own error.
+    """
+    added_files = []
+    _stage_batch(repo, list(dict.fromkeys(files)), added_files)
+    return added_files
+
+def _stage_batch(repo, files, added_files):
+    from git import exc
+    while files:
+        try:
+            add_pathspecs(repo, files)
+            added_files.extend(files)
+            return
+        except exc.GitCommandError as e:
+            if len(files) == 1:
+                logger.error(f"{ERROR_TEXT}Error adding file {files[0]}: {e}{RESET_TEXT}")
+                return
+            match = PATHSPEC_NOT_MATCHED.search(str(e.stderr))
+            if match and match.group(1) in files:
+                logger.error(f"{ERROR_TEXT}Error adding file {match.group(1)}: {e}{RESET_TEXT}")
+                files = [file for file in files if file != match.group(1)]
+                continue
+            middle = len(files) // 2
+            _stage_batch(repo, files[:middle], added_files)
+            _stage_batch(repo, files[middle:], added_files)
+            return
+
+def add_pathspecs(repo, files):
+    """Run a single `git add` for files, passing the paths NUL-separated on stdin."""
+    with tempfile.TemporaryFile() as pathspecs:
+        pathspecs.write(b'\0'.join(os.fsencode(file) for file in files))
+        pathspecs.seek(0)
+        # Literal pathspecs, so names like 'report[1].txt' are not read as globs
+        repo.git.execute(
+            ['git', '--literal-pathspecs', 'add', '--pathspec-from-file=-', '--pathspec-file-nul'],
+            istream=pathspecs,
+        )
+
 def git_add(repo):
     """
     Interactive function to add files to the Git staging area.
@@ -35,22 +87,40 @@ def git_add(repo):
     This function helps you select which files (untracked or modified) you want to stage.
     You can add all files at once, or select specific files by number or name.
     """
+    from git import exc
+
+    # Gather all untracked (new), modified-but-not-staged and conflicted files in one status scan
+    status = get_repo_status(repo)
+    stageable = status.untracked + status.unstaged + status.conflicted
+    if len(stageable) > STAGING_TREE_THRESHOLD:
+        # Too many to list one by one, so group them by directory instead
+        git_add_grouped(repo, stageable)
+        return
 
-    # Gather all untracked (new) and modified-but-not-staged files
-    untracked_files = repo.untracked_files
-    modified_not_staged_files = repo.git.diff('--name-only').splitlines()
-    files_to_display = untracked_files + modified_not_staged_files
+    untracked_files = [entry.path for entry in status.untracked]
+    modified_not_staged_files = [entry.path for entry in status.unstaged]
+    conflicted_files = [entry.path for entry in status.conflicted]
+    files_to_display = untracked_files + modified_not_staged_files + conflicted_files
+    # Sets for the per-row and per-entry lookups below
+    untracked_set = set(untracked_files)
+    conflicted_set = set(conflicted_files)
+    displayed_set = set(files_to_display)
 
     # If there are no files to add, inform the user and exit early
     if not files_to_display:
-        logger.info(f"{ANSWER_TEXT}No untracked or modified files found.{RESET_TEXT}")
+        logger.info(f"{ANSWER_TEXT}No untracked, modified or conflicted files found.{RESET_TEXT}")
         return
 
     # Print the list of files that can be staged, with index and status
     print(f"{QUESTION_TEXT}Files ready for staging:{RESET_TEXT}")
     for idx, file in enumerate(files_to_display, 1):
-        status = "Untracked" if file in untracked_files else "Modified (not staged)"
-        print(f"{idx}. {file} ({status})")
+        if file in untracked_set:
+            label = "Untracked"
+        elif file in conflicted_set:
+            label = "Conflicted"
+        else:
+            label = "Modified (not staged)"
+        print(f"{idx}. {file} ({label})")
 
     # Loop until the user makes a valid decision
     while True:
@@ -63,7 +133,7 @@ def git_add(repo):
                 logger.info(f"{ANSWER_TEXT}All files added successfully!{RESET_TEXT}")
                 print(f"{ANSWER_TEXT}Staged files:\n" + '\n'.join(files_to_display) + RESET_TEXT)
                 break
-            except git.exc.GitCommandError as e:
+            except exc.GitCommandError as e:
                 # Handle git errors (e.g., permission issues)
                 logger.error(f"{ERROR_TEXT}Error adding files: {e}{RESET_TEXT}")
 
@@ -76,7 +146,7 @@ def git_add(repo):
                 if entry.isdigit() and 1 <= int(entry) <= len(files_to_display):
                     files_to_add.append(files_to_display[int(entry)-1])
                 # If input is a filename, use it directly
-                elif entry in files_to_display:
+                elif entry in displayed_set:
                     files_to_add.append(entry)
                 else:
                     # Warn about invalid entries
@@ -87,18 +157,12 @@ def git_add(repo):
                 logger.warning(f"{WARNING_TEXT}No valid files provided. Please specify files to add or choose 'yes' to add all.{RESET_TEXT}")
                 continue
 
-            # Try to add each selected file, handling errors per file
-            added_any = False
-            for file in files_to_add:
-                try:
-                    repo.git.add(file)
-                    added_any = True
-                except git.exc.GitCommandError as e:
-                    logger.error(f"{ERROR_TEXT}Error adding file {file}: {e}{RESET_TEXT}")
+            # Add the selected files in one call; errors are still reported per file
+            added_files = stage_files(repo, files_to_add)
 
             # If any files were successfully added, confirm and exit loop
-            if added_any:
-                logger.info(f"{ANSWER_TEXT}Selected files have been added:{RESET_TEXT}\n" + '\n'.join(files_to_add))
+            if added_files:
+                logger.info(f"{ANSWER_TEXT}Selected files have been added:{RESET_TEXT}\n" + '\n'.join(added_files))
                 break
 
         elif user_decision == 'exit':
@@ -109,3 +173,136 @@ def git_add(repo):
         else:
             # Any other response is invalid; user is prompted again
             logger.warning(f"{WARNING_TEXT}Invalid input. Please enter 'yes', 'no', or 'exit'.{RESET_TEXT}")
+
+# --- Stage from a directory listing, for large change sets --- #
+FILE_KIND_LABELS = {'?': 'Untracked', 'M': 'Modified', 'D': 'Deleted', 'T': 'Type changed', 'U': 'Conflicted'}
+
+def git_add_grouped(repo, entries):
+    """
+    Interactive staging for large change sets.
+
+    The files are shown as collapsed directories with file counts. Whole
+    directories, single files or glob matches can be selected, and each
+    selected directory is staged as one pathspec.
+    """
+    from git import exc
+
+    tree = PathTree((entry.path, file_kind(entry)) for entry in entries)
+    print(f"{QUESTION_TEXT}Files ready for staging: {len(tree)} files{RESET_TEXT}")
+    print_tree_rows(tree.rows())
+
+    while True:
+        user_decision = input(f"{QUESTION_TEXT}Would you like to add all files? (yes/no/exit): {RESET_TEXT}").strip().lower()
+        if user_decision == 'yes':
+            try:
+                repo.git.add('-A')
+                logger.info(f"{ANSWER_TEXT}All {len(tree)} files added successfully!{RESET_TEXT}")
+                return
+            except exc.GitCommandError as e:
+                logger.error(f"{ERROR_TEXT}Error adding files: {e}{RESET_TEXT}")
+
+        elif user_decision == 'no':
+            pathspecs = select_from_tree(tree)
+            if pathspecs is None:
+                logger.info(f"{ANSWER_TEXT}Exiting file addition process.{RESET_TEXT}")
+                return
+            if not pathspecs:
+                logger.warning(f"{WARNING_TEXT}No files selected. Please select files to add or choose 'yes' to add all.{RESET_TEXT}")
+                continue
+            added = stage_files(repo, pathspecs)
+            if added:
+                # A directory pathspec stages every changed file under it
+                count = sum(tree.count_under(path) for path in added)
+                logger.info(f"{ANSWER_TEXT}{count} selected files have been added.{RESET_TEXT}")
+                if len(added) <= STAGING_TREE_THRESHOLD:
+                    print('\n'.join(added))
+                return
+
+        elif user_decision == 'exit':
+            logger.info(f"{ANSWER_TEXT}Exiting file addition process.{RESET_TEXT}")
+            return
+
+        else:
+            logger.warning(f"{WARNING_TEXT}Invalid input. Please enter 'yes', 'no', or 'exit'.{RESET_TEXT}")
+
+def file_kind(entry):
+    """Return the FILE_KIND_LABELS key for a stageable entry."""
+    if entry.conflicted:
+        return 'U'
+    return entry.worktree_state if entry.worktree_state != '.' else 'M'
+
+def print_tree_rows(rows, selected_dirs=(), selected_files=()):
+    for number, (depth, label, path, is_directory, info) in enumerate(rows, 1):
+        chosen = path in selected_dirs or path in selected_files or is_under(path, selected_dirs)
+        mark = f"{ANSWER_TEXT}*{RESET_TEXT}" if chosen else " "
+        indent = "  " * depth
+        if is_directory:
+            print(f"{mark}{number:>4}. {indent}{ANSWER_TEXT}{label}{RESET_TEXT} ({info} files)")
+        else:
+            print(f"{mark}{number:>4}. {indent}{label} ({FILE_KIND_LABELS.get(info, info)})")
+
+def select_from_tree(tree):
+    """
+    Let the user build a selection from the collapsed listing.
+
+    Returns the pathspecs to stage (directories and files), or None to exit.
+    """
+    expanded = set()
+    selected_dirs = set()
+    selected_files = set()
+    help_text = (
+        f"{HELP_TEXT}Enter row numbers to select or unselect them (a directory selects everything under it),\n"
+        f"'e N' to expand a directory, 'c N' to collapse it, 'g PATTERN' to select files matching a glob\n"
+        f"(e.g. 'g *.py' or 'g src/*'), 'done' to stage the selection or 'exit'.{RESET_TEXT}"
+    )
+    print(help_text)
+
+    while True:
+        rows = tree.rows(expanded)
+        command = input(f"{QUESTION_TEXT}Select: {RESET_TEXT}").strip()
+        action, _, argument = command.partition(' ')
+        action = action.lower()
+
+        if action == 'done':
+            return minimal_pathspecs(selected_dirs, selected_files)
+        if action == 'exit':
+            return None
+
+        if action == 'g' and argument:
+            matches = list(tree.match(argument.strip()))
+            selected_files.update(matches)
+            print(f"{OUTPUT_TEXT}{len(matches)} files match {argument.strip()}{RESET_TEXT}")
+
+        elif action in ('e', 'c') and argument.strip().isdigit():
+            number = int(argument)
+            if not 1 <= number <= len(rows) or not rows[number - 1][3]:
+                logger.warning(f"{WARNING_TEXT}Row {number} is not a directory.{RESET_TEXT}")
+                continue
+            path = rows[number - 1][2]
+            if action == 'e':
+                expanded.add(path)
+            else:
+                expanded = {other for other in expanded if other != path and not other.startswith(f'{path}/')}
+
+        elif command and all(token.isdigit() for token in command.split()):
+            for token in command.split():
+                number = int(token)
+                if not 1 <= number <= len(rows):
+                    logger.warning(f"{WARNING_TEXT}Entry '{token}' was not in the list and was skipped.{RESET_TEXT}")
+                    continue
+                _, _, path, is_directory, _ = rows[number - 1]
+                chosen = selected_dirs if is_directory else selected_files
+                if path in chosen:
+                    chosen.discard(path)
+                elif is_under(path, selected_dirs):
+                    logger.warning(f"{WARNING_TEXT}{path} is already selected through its directory.{RESET_TEXT}")
+                else:
+                    chosen.add(path)
+
+        else:
+            print(help_text)
+            continue
+
+        count = sum(tree.count_under(path) for path in minimal_pathspecs(selected_dirs, selected_files))
+        print_tree_rows(tree.rows(expanded), selected_dirs, selected_files)
+        print(f"{OUTPUT_TEXT}{count} of {len(tree)} files selected.{RESET_TEXT}")
@@ -1,9 +1,9 @@
 # git_commit.py
-from git import Repo, exc
 from src.utils import (
     setup_logging,
     get_uncommitted_changes,
 )
+from src.git_status import ChangedFiles
 
 from src.config import (
     BOLD_TEXT,
@@ -27,14 +27,8 @@ logger = setup_logging()
 
 
 def git_commit(repo):
-
-    def get_changed_files():
-        untracked = repo.untracked_files
-        changed = [item.a_path for item in repo.index.diff(None)]
-        staged = [item.a_path for item in repo.index.diff('HEAD')]
-        return untracked, changed, staged
-
-    untracked_files, changed_files, staged_files = get_changed_files()
+    # Only the staged list is needed, so the working tree is never scanned
+    staged_files = ChangedFiles(repo).staged
 
     if not staged_files:
         logger.info(f"{ANSWER_TEXT}No staged changes to commit.{RESET_TEXT}")
@@ -58,13 +52,21 @@ def git_commit(repo):
             logger.info(f"{ANSWER_TEXT}Exiting commit process.{RESET_TEXT}")
             return
 
+    commit_staged(repo, commit_message)
+
+# --- Commit whatever is staged --- #
+def commit_staged(repo, commit_message):
+    """Commit the staged changes with commit_message. Returns True on success."""
+    from git import exc
     try:
         repo.git.commit('-m', commit_message)
         logger.info(f"{ANSWER_TEXT}Staged changes have been committed.{RESET_TEXT}")
-    except git.exc.GitCommandError as e:
+        return True
+    except exc.GitCommandError as e:
         logger.error(f"{ERROR_TEXT}Error committing changes: {e}{RESET_TEXT}")
     except Exception as e:
         logger.error(f"{ERROR_TEXT}An unexpected error occurred: {e}{RESET_TEXT}")
+    return False
 
 
 
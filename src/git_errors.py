@@ -0,0 +1,47 @@
+# git_errors.py
+
+# Kinds of git failure, from the most specific to the most general
+CONFLICT = 'conflict'
+REJECTED = 'rejected'
+NOT_FAST_FORWARD = 'not-fast-forward'
+LOCAL_CHANGES = 'local-changes'
+AUTHENTICATION = 'authentication'
+NETWORK = 'network'
+TIMEOUT = 'timeout'
+NO_REMOTE_BRANCH = 'no-remote-branch'
+OTHER = 'error'
+
+# Text git prints for each kind of failure (checked in this order)
+GIT_ERROR_PATTERNS = [
+    (CONFLICT, ('fix conflicts', 'CONFLICT')),
+    (REJECTED, ('rejected',)),
+    (NO_REMOTE_BRANCH, ("couldn't find remote ref",)),
+    (NOT_FAST_FORWARD, ('Not possible to fast-forward', 'not possible to fast-forward')),
+    (LOCAL_CHANGES, ('would be overwritten', 'Please commit your changes or stash them')),
+    (AUTHENTICATION, ('Authentication failed', 'Permission denied', 'could not read Username', 'terminal prompts disabled')),
+    (NETWORK, (
+        'Could not resolve host', 'Connection refused', 'Connection timed out',
+        'unable to access', 'Could not read from remote repository', 'does not appear to be a git repository',
+    )),
+]
+
+# What the user can do about each kind of failure
+GIT_ERROR_ADVICE = {
+    CONFLICT: "Merge conflict detected! Please resolve the conflicts manually and then commit the changes.",
+    REJECTED: "Push was rejected. Consider pulling changes first and then try pushing again.",
+    NOT_FAST_FORWARD: "The branch has diverged from origin and cannot be fast-forwarded. Pull it on its own to merge or rebase.",
+    LOCAL_CHANGES: "Local changes would be overwritten. Commit or stash them first.",
+    AUTHENTICATION: "Authentication with the remote failed. Check your credentials or SSH key.",
+    NETWORK: "The remote could not be reached. Check the origin URL and your network connection.",
+    TIMEOUT: "The remote did not answer in time.",
+    NO_REMOTE_BRANCH: "The branch does not exist on origin yet. Push it to create it.",
+}
+
+# --- Work out why a git command failed --- #
+def classify_git_error(error):
+    """Return the kind of failure (e.g. CONFLICT or REJECTED) for a GitCommandError or git's stderr text."""
+    message = str(error)
+    for kind, patterns in GIT_ERROR_PATTERNS:
+        if any(pattern in message for pattern in patterns):
+            return kind
+    return OTHER
@@ -0,0 +1,175 @@
+# git_fetch.py
+import os
+import time
+import threading
+
+from src.utils import setup_logging
+from src.git_errors import classify_git_error, NO_REMOTE_BRANCH
+from src.status_cache import read_ref
+from src.config import FETCH_TTL_SECONDS, FETCH_MODE
+
+logger = setup_logging()
+
+# When each repository was last fetched in this session: (git_dir, branch) -> time.monotonic()
+# A full fetch is recorded with branch None, as it covers every branch
+_session_fetches = {}
+
+def _record_fetch(git_dir, branch_name, full):
+    _session_fetches[(git_dir, None if full else branch_name)] = time.monotonic()
+
+def get_session_fetch_age(repo, branch_name=None):
+    """Return the seconds since this session fetched branch_name, or None."""
+    times = [
+        _session_fetches.get((repo.git_dir, None)),
+        _session_fetches.get((repo.git_dir, branch_name)) if branch_name else None,
+    ]
+    times = [t for t in times if t is not None]
+    return time.monotonic() - max(times) if times else None
+
+# --- Build the fetch arguments --- #
+def is_full_fetch(branch_name=None, full=None):
+    if full is None:
+        full = FETCH_MODE == 'full'
+    return full or not branch_name
+
+def get_fetch_args(branch_name=None, full=None):
+    """
+    Return the arguments for `git fetch` from origin.
+
+    By default only refs/heads/<branch_name> is fetched into its tracking ref.
+    With protocol v2 the explicit refspec becomes a ref-prefix filter, so the
+    remote does not advertise its other branches, tags and PR refs. A full
+    fetch is used when full is set, FETCH_MODE is 'full' or there is no branch.
+    """
+    if is_full_fetch(branch_name, full):
+        return ['fetch', 'origin']
+    return [
+        '-c', 'protocol.version=2', 'fetch', '--no-tags', 'origin',
+        f'+refs/heads/{branch_name}:refs/remotes/origin/{branch_name}',
+    ]
+
+def get_background_env():
+    """
+    Return os.environ for a git command nobody is watching: a password or
+    host key prompt fails the command instead of waiting on the terminal.
+    """
+    env = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+    env.setdefault('GIT_SSH_COMMAND', 'ssh -o BatchMode=yes')
+    return env
+
+# --- Fetch from origin in the foreground --- #
+def fetch_origin(repo, branch_name=None, full=None, max_age=None):
+    """
+    Fetch from origin and wait for it to finish. Used by explicit pull/push.
+
+    With max_age set, a fetch this session did less than max_age seconds ago is
+    reused instead. Returns True if a fetch was run.
+    """
+    full = is_full_fetch(branch_name, full)
+    if max_age is not None:
+        age = get_session_fetch_age(repo, None if full else branch_name)
+        if age is not None and age < max_age:
+            return False
+    _run_fetch(repo.git, repo.git_dir, branch_name, full)
+    return True
+
+def _run_fetch(git, git_dir, branch_name, full, env=None):
+    from git import exc
+    try:
+        git.execute(['git', *get_fetch_args(branch_name, full)], env=env)
+    except exc.GitCommandError as e:
+        # A branch that was never pushed has nothing to fetch; has_remote_branch()
+        # tells callers there is no origin/<branch_name> to compare with
+        if full or classify_git_error(e) != NO_REMOTE_BRANCH:
+            raise
+    _record_fetch(git_dir, branch_name, full)
+
+def has_remote_branch(repo, branch_name):
+    """True if origin/<branch_name> exists locally, i.e. the branch has been pushed."""
+    return read_ref(repo.common_dir, f'refs/remotes/origin/{branch_name}') is not None
+
+# --- How old are the remote-tracking refs? --- #
+def get_last_fetch_age(repo):
+    """
+    Return the seconds since the last fetch, or None if origin was never fetched.
+
+    Every fetch rewrites FETCH_HEAD, so its mtime tells us how fresh the
+    remote-tracking refs are without touching the network.
+    """
+    return get_fetch_head_age(repo.git_dir)
+
+def get_fetch_head_age(git_dir):
+    """get_last_fetch_age for a .git directory, without opening the repository."""
+    try:
+        return max(0.0, time.time() - os.path.getmtime(os.path.join(git_dir, 'FETCH_HEAD')))
+    except OSError:
+        return None
+
+# --- Fetch from origin in the background --- #
+class FetchScheduler:
+    """
+    Keeps origin's remote-tracking refs fresh without blocking the menu.
+
+    The menu renders straight away from the refs it already has. When they are
+    older than the TTL a fetch starts on a worker thread, and on_complete is
+    called once it finishes so the caller can redraw.
+    """
+
+    def __init__(self, ttl=FETCH_TTL_SECONDS):
+        self.ttl = ttl
+        self.last_error = None
+        # When a fetch last failed, per .git directory; it is not retried before the TTL
+        self._failed_at = {}
+        self._thread = None
+        self._running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_running(self):
+        return self._running
+
+    def request(self, repo, branch_name=None, on_complete=None, force=False, full=None):
+        """Start a background fetch if the refs are stale (or force is set)."""
+        with self._lock:
+            if self.is_running:
+                return False
+            age = get_last_fetch_age(repo)
+            if not force and age is not None and age < self.ttl:
+                return False
+            failed_at = self._failed_at.get(repo.git_dir)
+            if not force and failed_at is not None and time.monotonic() - failed_at < self.ttl:
+                # A failed fetch leaves FETCH_HEAD as it was, so it would otherwise run again every time
+                return False
+            # The worker gets its own command object so it never shares state
+            # with the Repo the menu is using
+            worker_git = repo.GitCommandWrapperType(repo.working_tree_dir)
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run,
+                name='background-fetch',
+                args=(worker_git, repo.git_dir, branch_name, is_full_fetch(branch_name, full), on_complete),
+                daemon=True,
+            )
+            self._thread.start()
+            return True
+
+    def wait(self, timeout=None):
+        """Block until the running fetch (if any) has finished."""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self, worker_git, git_dir, branch_name, full, on_complete):
+        try:
+            # The menu owns the terminal while this runs, so git must not prompt on it
+            _run_fetch(worker_git, git_dir, branch_name, full, env=get_background_env())
+            self._failed_at.pop(git_dir, None)
+            self.last_error = None
+        except Exception as e:
+            self._failed_at[git_dir] = time.monotonic()
+            self.last_error = str(e)
+            logger.debug(f"Background fetch failed: {e}")
+        with self._lock:
+            self._running = False
+        if on_complete:
+            on_complete()
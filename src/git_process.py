@@ -0,0 +1,59 @@
+# git_process.py
+import time
+
+from src.trace import get_tracer, streaming
+
+# --- Stream raw output from a git command --- #
+def stream_git_chunks(repo, *args, chunk_size=65536):
+    """
+    Run a git command and yield its raw stdout in chunks of at most chunk_size bytes.
+
+    Stopping early kills the command, so a caller can bound how much it reads.
+    """
+    tracer = get_tracer()
+    started = time.perf_counter()
+    with streaming():
+        proc = repo.git.execute(['git', *args], as_process=True)
+    bytes_read = 0
+    finished = False
+    try:
+        while True:
+            chunk = proc.stdout.read(chunk_size)
+            if not chunk:
+                break
+            bytes_read += len(chunk)
+            yield chunk
+        finished = True
+    finally:
+        try:
+            if finished:
+                # Raises GitCommandError if git exited with an error
+                proc.wait()
+            else:
+                # The caller stopped reading early, so don't wait on a full pipe
+                proc.kill()
+                proc.stdout.close()
+        finally:
+            if tracer:
+                tracer.record(['git', *args], started, time.perf_counter() - started, bytes_read)
+
+# --- Stream NUL-separated records from a git command --- #
+def stream_git_records(repo, *args, separator=b'\0', chunk_size=65536):
+    """
+    Run a git command and yield its output one record at a time.
+
+    The output is read in fixed-size chunks, so memory stays flat no matter
+    how many records the command produces.
+    """
+    pending = b''
+    chunks = stream_git_chunks(repo, *args, chunk_size=chunk_size)
+    try:
+        for chunk in chunks:
+            pending += chunk
+            *records, pending = pending.split(separator)
+            for record in records:
+                yield record.decode('utf-8', errors='surrogateescape')
+        if pending:
+            yield pending.decode('utf-8', errors='surrogateescape')
+    finally:
+        chunks.close()
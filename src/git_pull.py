@@ -1,9 +1,10 @@
-from git import Repo, exc
-
 from src.utils import (
     setup_logging,
     get_uncommitted_changes,
 )
+from src.revisions import count_ahead_behind
+from src.git_fetch import fetch_origin, has_remote_branch
+from src.git_errors import classify_git_error, CONFLICT, GIT_ERROR_ADVICE
 
 from src.config import (
     BOLD_TEXT,
@@ -21,36 +22,67 @@ from src.config import (
     PROGRAM_HELP_TEXT,
     PROGRAM_VERSION,
     PROGRAM_DATE,
+    PULL_FETCH_REUSE_SECONDS,
 )
 
 logger = setup_logging()
 
 # --- Pull from origin --- #
 def git_pull(repo, branch_name):
+    from git import exc
     try:
-        # Fetch the latest changes from the remote origin
-        repo.remotes.origin.fetch()
+        # Reuse a fetch this session made moments ago (e.g. the status refresh);
+        # otherwise fetch now
+        fetch_origin(repo, branch_name, max_age=PULL_FETCH_REUSE_SECONDS)
+
+        if not has_remote_branch(repo, branch_name):
+            logger.info(f"{ANSWER_TEXT}The {branch_name} branch is not on the origin yet, so there is nothing to pull.{RESET_TEXT}")
+            return True
 
         # Check if there are any new commits on the remote branch that aren't on the local branch
-        commits_behind = list(repo.iter_commits(f'{branch_name}..origin/{branch_name}'))
-        
-        if commits_behind:
-            # Merge the changes from the remote branch into the local branch
-            repo.git.pull('origin', branch_name)
-            
-            # Log a success message if the pull operation is successful
-            logger.info(f"{ANSWER_TEXT}Successfully pulled changes from the remote origin to the local {branch_name} branch.{RESET_TEXT}")
-        else:
+        commits_ahead, commits_behind = count_ahead_behind(repo, branch_name, f'origin/{branch_name}')
+
+        if not commits_behind:
             # Log a message indicating the local branch is already up to date with the remote branch
             logger.info(f"{ANSWER_TEXT}The local {branch_name} branch is already up to date with the remote origin.{RESET_TEXT}")
+            return True
+
+        if not commits_ahead:
+            # Nothing to merge: move the branch and working tree forward locally,
+            # without another round trip to the remote
+            repo.git.merge('--ff-only', f'origin/{branch_name}')
+        else:
+            # The branches have diverged, so merge or rebase as pull.rebase says
+            integrate_diverged_branch(repo, branch_name)
+
+        # Log a success message if the pull operation is successful
+        logger.info(f"{ANSWER_TEXT}Successfully pulled changes from the remote origin to the local {branch_name} branch.{RESET_TEXT}")
+        return True
 
-    except git.exc.GitCommandError as e:
+    except exc.GitCommandError as e:
         # Handle specific Git errors, like merge conflicts
-        if 'fix conflicts' in str(e):
-            logger.error(f"{ERROR_TEXT}Merge conflict detected! Please resolve the conflicts manually and then commit the changes.{RESET_TEXT}")
+        if classify_git_error(e) == CONFLICT:
+            logger.error(f"{ERROR_TEXT}{GIT_ERROR_ADVICE[CONFLICT]}{RESET_TEXT}")
         else:
             logger.error(f"{ERROR_TEXT}Error pulling changes from the origin: {e}{RESET_TEXT}")
+        return False
 
     except Exception as e:
         # Log an error message if any other exception occurs during the pull operation
         logger.error(f"{ERROR_TEXT}An unexpected error occurred: {e}{RESET_TEXT}")
+        return False
+
+# --- Combine a diverged branch with its remote counterpart --- #
+def integrate_diverged_branch(repo, branch_name):
+    from git import exc
+    try:
+        pull_rebase = repo.git.config('--get', 'pull.rebase').strip().lower()
+    except exc.GitCommandError:
+        pull_rebase = 'false'
+
+    if pull_rebase in ('true', 'interactive'):
+        repo.git.rebase(f'origin/{branch_name}')
+    elif pull_rebase == 'merges':
+        repo.git.rebase('--rebase-merges', f'origin/{branch_name}')
+    else:
+        repo.git.merge(f'origin/{branch_name}')
@@ -1,10 +1,11 @@
 # git_push.py
-from git import Repo, exc
-
 from src.utils import (
     setup_logging,
     get_uncommitted_changes,
 )
+from src.revisions import count_ahead_behind
+from src.git_fetch import fetch_origin, has_remote_branch
+from src.git_errors import classify_git_error, REJECTED, GIT_ERROR_ADVICE
 
 from src.config import (
     BOLD_TEXT,
@@ -28,26 +29,40 @@ logger = setup_logging()
 
 # --- Push commits from the local branch to the remote origin ---#
 def git_push(repo, branch_name):
+    from git import exc
     try:
+        # Fetch first so the unpushed commit count is against the real remote state
+        fetch_origin(repo, branch_name)
+
+        if not has_remote_branch(repo, branch_name):
+            # A new branch: every commit on it is unpushed, so push it and track it
+            repo.git.push('--set-upstream', 'origin', branch_name)
+            logger.info(f"{ANSWER_TEXT}Branch {branch_name} has been pushed to the origin for the first time.{RESET_TEXT}")
+            return True
+
         # Check for unpushed commits
-        commits_ahead = list(repo.iter_commits(f'origin/{branch_name}..{branch_name}'))
+        commits_ahead, _ = count_ahead_behind(repo, branch_name, f'origin/{branch_name}')
 
         # If there are unpushed commits, push them to the remote
         if commits_ahead:
             # Attempt to push commits from the specified local branch to the corresponding remote branch on the origin
             repo.git.push('origin', branch_name)
             logger.info(f"{ANSWER_TEXT}Unpushed commits have been pushed to the origin.{RESET_TEXT}")
+            return True
         else:
             # Log a message indicating there were no unpushed commits
             logger.info(f"{ANSWER_TEXT}No unpushed commits to push to the origin.{RESET_TEXT}")
+            return True
 
-    except git.exc.GitCommandError as e:
+    except exc.GitCommandError as e:
         # Handle specific Git errors, suggesting pull if push is rejected
-        if 'rejected' in str(e):
-            logger.error(f"{ERROR_TEXT}Push was rejected. Consider pulling changes first and then try pushing again.{RESET_TEXT}")
+        if classify_git_error(e) == REJECTED:
+            logger.error(f"{ERROR_TEXT}{GIT_ERROR_ADVICE[REJECTED]}{RESET_TEXT}")
         else:
             logger.error(f"{ERROR_TEXT}Error pushing commits: {e}{RESET_TEXT}")
+        return False
 
     except Exception as e:
         # Log an error message if any other exception occurs during the push operation
         logger.error(f"{ERROR_TEXT}An unexpected error occurred: {e}{RESET_TEXT}")
+        return False
@@ -0,0 +1,200 @@
+# git_status.py
+from functools import cached_property
+
+from src.git_process import stream_git_records
+
+class FileEntry:
+    """
+    One changed path in the working tree.
+
+    index_state and worktree_state are git's X and Y status letters, '.' when
+    unchanged. Untracked files use '?' for both, and conflicted files keep the
+    letters from the unmerged entry.
+    """
+    __slots__ = ('path', 'index_state', 'worktree_state', 'original_path', 'conflicted')
+
+    def __init__(self, path, index_state, worktree_state, original_path=None, conflicted=False):
+        self.path = path
+        self.index_state = index_state
+        self.worktree_state = worktree_state
+        self.original_path = original_path
+        self.conflicted = conflicted
+
+    @property
+    def is_untracked(self):
+        return self.index_state == '?'
+
+    @property
+    def is_staged(self):
+        return not self.conflicted and self.index_state not in '.?'
+
+    @property
+    def is_unstaged(self):
+        return not self.conflicted and self.worktree_state not in '.?'
+
+    def to_dict(self):
+        return {
+            'path': self.path,
+            'index': self.index_state,
+            'worktree': self.worktree_state,
+            'original_path': self.original_path,
+            'conflicted': self.conflicted,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['path'], data['index'], data['worktree'], data['original_path'], data['conflicted'])
+
+class RepoStatus:
+    """
+    Branch, working tree and (optionally) remote comparison for a repository.
+
+    The git layer fills this in; the renderers in display.py turn it into text.
+    """
+    __slots__ = (
+        'branch', 'upstream', 'ahead', 'behind', 'entries', 'latest_tag',
+        'files_to_pull', 'commits_to_push', 'error',
+    )
+
+    def __init__(self, branch=None, upstream=None, ahead=0, behind=0, entries=None, latest_tag=None):
+        self.branch = branch
+        self.upstream = upstream
+        self.ahead = ahead
+        self.behind = behind
+        self.entries = entries if entries is not None else []
+        self.latest_tag = latest_tag
+        # Filled in by compare_with_origin
+        self.files_to_pull = []
+        self.commits_to_push = []  # (short sha, author, summary), newest first
+        self.error = None
+
+    @property
+    def staged(self):
+        return [entry for entry in self.entries if entry.is_staged]
+
+    @property
+    def unstaged(self):
+        return [entry for entry in self.entries if entry.is_unstaged]
+
+    @property
+    def untracked(self):
+        return [entry for entry in self.entries if entry.is_untracked]
+
+    @property
+    def conflicted(self):
+        return [entry for entry in self.entries if entry.conflicted]
+
+    @property
+    def renamed(self):
+        return [entry for entry in self.entries if entry.original_path is not None]
+
+    def counts(self):
+        counts = {'staged': 0, 'unstaged': 0, 'untracked': 0, 'conflicted': 0}
+        for entry in self.entries:
+            if entry.conflicted:
+                counts['conflicted'] += 1
+            elif entry.is_untracked:
+                counts['untracked'] += 1
+            else:
+                counts['staged'] += entry.is_staged
+                counts['unstaged'] += entry.is_unstaged
+        return counts
+
+    def to_dict(self):
+        return {
+            'branch': self.branch,
+            'upstream': self.upstream,
+            'latest_tag': self.latest_tag,
+            'ahead': self.ahead,
+            'behind': self.behind,
+            'counts': self.counts(),
+            'entries': [entry.to_dict() for entry in self.entries],
+            'files_to_pull': self.files_to_pull,
+            'commits_to_push': [list(commit) for commit in self.commits_to_push],
+            'error': self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a RepoStatus from to_dict() output, e.g. the status cache."""
+        status = cls(data['branch'], data['upstream'], data['ahead'], data['behind'],
+                     [FileEntry.from_dict(entry) for entry in data['entries']], data['latest_tag'])
+        status.files_to_pull = data['files_to_pull']
+        status.commits_to_push = [tuple(commit) for commit in data['commits_to_push']]
+        status.error = data['error']
+        return status
+
+# --- Read the full repository status in a single pass --- #
+def get_repo_status(repo):
+    """
+    Collect the branch and working tree status from one streamed call to
+    `git status --porcelain=v2 -z --branch` and return it as a RepoStatus.
+
+    ahead/behind are relative to the branch's upstream (0 when there is none).
+    """
+    status = RepoStatus()
+    entries = status.entries
+
+    records = stream_git_records(
+        repo, 'status', '--porcelain=v2', '-z', '--branch', '--untracked-files=all'
+    )
+    for record in records:
+        if not record:
+            continue
+        kind = record[0]
+
+        if kind == '#':
+            # Branch headers, e.g. "# branch.head main" or "# branch.ab +1 -2"
+            _, key, value = record.split(' ', 2)
+            if key == 'branch.head' and value != '(detached)':
+                status.branch = value
+            elif key == 'branch.upstream':
+                status.upstream = value
+            elif key == 'branch.ab':
+                ahead, behind = value.split(' ')
+                status.ahead = int(ahead)
+                status.behind = -int(behind)
+
+        elif kind == '1':
+            # Ordinary change: "1 XY sub mH mI mW hH hI path"
+            fields = record.split(' ', 8)
+            entries.append(FileEntry(fields[8], fields[1][0], fields[1][1]))
+
+        elif kind == '2':
+            # Rename or copy: "2 XY sub mH mI mW hH hI Xscore path", followed
+            # by the original path as its own NUL-terminated record
+            fields = record.split(' ', 9)
+            original_path = next(records)
+            entries.append(FileEntry(fields[9], fields[1][0], fields[1][1], original_path))
+
+        elif kind == 'u':
+            # Unmerged: "u XY sub m1 m2 m3 mW h1 h2 h3 path"
+            fields = record.split(' ', 10)
+            entries.append(FileEntry(fields[10], fields[1][0], fields[1][1], conflicted=True))
+
+        elif kind == '?':
+            entries.append(FileEntry(record[2:], '?', '?'))
+
+    return status
+
+# --- Staged paths, read only when asked for --- #
+class ChangedFiles:
+    """
+    The staged paths of a repository, read the first time they are used.
+
+    Unlike get_repo_status, this compares only the index with HEAD's tree
+    and never scans the working tree, which is all committing needs.
+    """
+
+    def __init__(self, repo):
+        self._repo = repo
+
+    @cached_property
+    def staged(self):
+        if not self._repo.head.is_valid():
+            # Unborn branch: there is no HEAD yet, so everything in the index is new
+            return _paths(self._repo, 'ls-files', '-z')
+        return _paths(self._repo, 'diff-index', '--cached', '--name-only', '-z', 'HEAD')
+
+def _paths(repo, *args):
+    return [record for record in stream_git_records(repo, *args) if record]
@@ -0,0 +1,127 @@
+# path_tree.py
+from sys import intern
+from fnmatch import fnmatchcase
+
+class DirectoryNode:
+    """
+    One directory in a PathTree.
+
+    Only path components are stored (not full paths), and they are interned,
+    so shared prefixes and names repeated across directories (index.js,
+    package.json, ...) are stored once.
+    """
+    __slots__ = ('dirs', 'files', 'count')
+
+    def __init__(self):
+        self.dirs = {}   # name -> DirectoryNode
+        self.files = {}  # name -> kind, e.g. '?' for untracked or 'M' for modified
+        self.count = 0   # Files anywhere under this directory
+
+class PathTree:
+    """Changed paths grouped by directory, with a file count for every directory."""
+
+    def __init__(self, paths=()):
+        self.root = DirectoryNode()
+        for path, kind in paths:
+            self.add(path, kind)
+
+    def __len__(self):
+        return self.root.count
+
+    def add(self, path, kind):
+        *directories, name = path.split('/')
+        node = self.root
+        node.count += 1
+        for directory in directories:
+            child = node.dirs.get(directory)
+            if child is None:
+                child = node.dirs[intern(directory)] = DirectoryNode()
+            node = child
+            node.count += 1
+        node.files[intern(name)] = kind
+
+    def find(self, directory):
+        """Return the DirectoryNode for a directory path ('' for the root), or None."""
+        node = self.root
+        for name in filter(None, directory.split('/')):
+            node = node.dirs.get(name)
+            if node is None:
+                return None
+        return node
+
+    def kind_of(self, path):
+        """Return the kind a file was added with, or None if it is not in the tree."""
+        directory, _, name = path.rpartition('/')
+        node = self.find(directory)
+        return node.files.get(name) if node else None
+
+    def count_under(self, path):
+        """Return the files a pathspec selects: all files under a directory, 1 for a file."""
+        if self.kind_of(path) is not None:
+            return 1
+        node = self.find(path)
+        return node.count if node else 0
+
+    def iter_files(self, directory=''):
+        """Yield the full path of every file under directory, one at a time."""
+        node = self.find(directory)
+        if node is None:
+            return
+        stack = [(directory.strip('/'), node)]
+        while stack:
+            prefix, node = stack.pop()
+            base = f'{prefix}/' if prefix else ''
+            for name in sorted(node.files):
+                yield base + name
+            for name in sorted(node.dirs, reverse=True):
+                stack.append((base + name, node.dirs[name]))
+
+    def match(self, pattern):
+        """Yield the files whose full path matches a glob pattern ('*' also matches '/')."""
+        return (path for path in self.iter_files() if fnmatchcase(path, pattern))
+
+    def rows(self, expanded=()):
+        """
+        Return the rows of a collapsible listing, directories first.
+
+        Each row is (depth, label, path, is_directory, count_or_kind). Only
+        directories in expanded are opened; a directory that holds nothing but
+        one subdirectory is shown on a single row, e.g. 'src/app/'.
+        """
+        rows = []
+        self._add_rows(rows, self.root, '', 0, set(expanded))
+        return rows
+
+    def _add_rows(self, rows, node, prefix, depth, expanded):
+        base = f'{prefix}/' if prefix else ''
+        for name in sorted(node.dirs):
+            child = node.dirs[name]
+            label = name
+            # Fold chains of single directories into one row
+            while len(child.dirs) == 1 and not child.files:
+                (only_name, only_child), = child.dirs.items()
+                label = f'{label}/{only_name}'
+                child = only_child
+            path = base + label
+            rows.append((depth, f'{label}/', path, True, child.count))
+            if path in expanded:
+                self._add_rows(rows, child, path, depth + 1, expanded)
+        for name in sorted(node.files):
+            rows.append((depth, name, base + name, False, node.files[name]))
+
+def is_under(path, directories):
+    """True if path is inside one of the directories (a set of directory paths)."""
+    parts = path.split('/')
+    return any('/'.join(parts[:i]) in directories for i in range(1, len(parts)))
+
+def minimal_pathspecs(directories, files):
+    """
+    Return the selected directories and files, leaving out anything already
+    covered by a selected parent directory.
+    """
+    kept = set()
+    # Parents sort before their subdirectories when ordered by depth
+    for directory in sorted(set(directories), key=lambda path: path.count('/')):
+        if not is_under(directory, kept):
+            kept.add(directory)
+    return sorted(kept) + sorted(file for file in set(files) if not is_under(file, kept))
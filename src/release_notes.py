@@ -0,0 +1,95 @@
+# release_notes.py
+import os
+import re
+
+from src.git_process import stream_git_records
+from src.config import RELEASE_NOTES_MAX_PER_GROUP
+
+# type(scope)!: description
+CONVENTIONAL_COMMIT = re.compile(
+    r'^(?P<type>[A-Za-z]+)(?:\((?P<scope>[^)]*)\))?(?P<breaking>!)?:\s*(?P<description>.+)$'
+)
+
+# Section titles in the order they appear in the changelog
+COMMIT_TYPE_TITLES = {
+    'breaking': 'Breaking Changes',
+    'feat': 'Features',
+    'fix': 'Bug Fixes',
+    'perf': 'Performance',
+    'refactor': 'Refactoring',
+    'docs': 'Documentation',
+    'test': 'Tests',
+    'build': 'Build',
+    'ci': 'Continuous Integration',
+    'style': 'Style',
+    'chore': 'Chores',
+    'revert': 'Reverts',
+    'other': 'Other Changes',
+}
+
+# --- Group the commits since the previous tag --- #
+def collect_release_notes(repo, previous_tag=None, max_per_group=RELEASE_NOTES_MAX_PER_GROUP):
+    """
+    Read the commits in previous_tag..HEAD from one streamed `git log` and
+    group them by conventional-commit type.
+
+    Returns (commit_count, groups) where groups maps a commit type to
+    {'count': total commits, 'entries': up to max_per_group summary lines}.
+    """
+    rev_range = f'{previous_tag}..HEAD' if previous_tag else 'HEAD'
+    groups = {}
+    commit_count = 0
+
+    for record in stream_git_records(repo, 'log', '--no-merges', '-z', '--format=%h %s', rev_range):
+        if not record:
+            continue
+        commit_count += 1
+        short_sha, _, subject = record.partition(' ')
+
+        match = CONVENTIONAL_COMMIT.match(subject)
+        if match:
+            commit_type = match.group('type').lower()
+            if match.group('breaking'):
+                commit_type = 'breaking'
+            elif commit_type not in COMMIT_TYPE_TITLES:
+                commit_type = 'other'
+            scope = match.group('scope')
+            description = f"**{scope}:** {match.group('description')}" if scope else match.group('description')
+        else:
+            commit_type = 'other'
+            description = subject
+
+        group = groups.setdefault(commit_type, {'count': 0, 'entries': []})
+        group['count'] += 1
+        if len(group['entries']) < max_per_group:
+            group['entries'].append(f"{description} ({short_sha})")
+
+    return commit_count, groups
+
+# --- Summarise the size of the release --- #
+def get_release_diffstat(repo, previous_tag=None):
+    """Return git's one-line summary of the changes since previous_tag."""
+    # Without a previous tag, compare against the empty tree
+    base = previous_tag or repo.git.hash_object('-t', 'tree', os.devnull)
+    return repo.git.diff('--shortstat', base, 'HEAD').strip()
+
+# --- Render the release notes as Markdown --- #
+def format_release_notes(repo, previous_tag=None):
+    commit_count, groups = collect_release_notes(repo, previous_tag)
+    since = f" since {previous_tag}" if previous_tag else ""
+    lines = [f"\n### Release notes ({commit_count} commits{since}):"]
+
+    for commit_type, title in COMMIT_TYPE_TITLES.items():
+        group = groups.get(commit_type)
+        if not group:
+            continue
+        lines.append(f"\n#### {title}")
+        lines.extend(f"- {entry}" for entry in group['entries'])
+        hidden = group['count'] - len(group['entries'])
+        if hidden:
+            lines.append(f"- ... and {hidden} more")
+
+    diffstat = get_release_diffstat(repo, previous_tag)
+    if diffstat:
+        lines.append(f"\n**Diffstat:** {diffstat}")
+    return '\n'.join(lines) + '\n'
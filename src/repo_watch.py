@@ -0,0 +1,318 @@
+# repo_watch.py
+import os
+import time
+import select
+import threading
+import subprocess
+
+from src.fs_watch import Inotify, IN_CREATE, IN_MOVED_TO, IN_ISDIR
+from src.status_cache import find_git_dirs, read_head, status_key
+from src.git_status import get_repo_status
+from src.tag_index import get_tag_index
+from src.cache import stat_signature
+from src.config import WATCH_DEBOUNCE_MS, WATCH_POLL_SECONDS
+
+# Parts of the status screen, each re-read only when something it depends on changes
+INFO = 'info'      # Origin URL: .git/config
+TAG = 'tag'        # Latest tag: refs/tags, packed-refs
+TREE = 'tree'      # Staged, unstaged and untracked files: the working tree, the index and HEAD
+REMOTE = 'remote'  # Ahead/behind origin, files to pull, commits to push: HEAD and the branch refs
+ALL_PARTS = frozenset((INFO, TAG, TREE, REMOTE))
+
+# Files at the top of .git and the parts that depend on them
+GIT_FILE_PARTS = {
+    'HEAD': {INFO, TREE, REMOTE},
+    'index': {TREE},
+    'config': {INFO, REMOTE},
+    'FETCH_HEAD': {REMOTE},
+    # Branches and tags are packed here by gc and pack-refs
+    'packed-refs': {TAG, TREE, REMOTE},
+}
+
+# A change that keeps coming is still shown at least this often
+MAX_DELAY_SECONDS = 0.5
+
+# --- Decide what an event affects --- #
+def parts_for_git_path(path, branch_name):
+    """Return the parts affected by a change to path (relative to .git, '/'-separated)."""
+    if path in GIT_FILE_PARTS:
+        return GIT_FILE_PARTS[path]
+    if path.startswith('refs/tags/'):
+        return {TAG}
+    if branch_name and path == f'refs/heads/{branch_name}':
+        # A commit, reset or pull moved the current branch
+        return {TREE, REMOTE}
+    if branch_name and path == f'refs/remotes/origin/{branch_name}':
+        return {REMOTE}
+    # Lock files, objects, logs, our own cache and other branches change nothing on screen
+    return set()
+
+# Fields of watch_key() and the parts that depend on them
+KEY_PARTS = {
+    'branch': {INFO, TREE, REMOTE},
+    'head': {TREE, REMOTE},
+    'upstream': {REMOTE},
+    'index': {TREE},
+    'tags': {TAG},
+    'config': {INFO, REMOTE},
+    'fetch_head': {REMOTE},
+}
+
+def watch_key(git_dir, common_dir):
+    """Return the state of .git that the status depends on (see status_key), read without git."""
+    key = status_key(git_dir, common_dir)
+    key['fetch_head'] = stat_signature(os.path.join(git_dir, 'FETCH_HEAD'))
+    return key
+
+def changed_parts(previous, current):
+    """Return the parts affected by the differences between two watch_key() results."""
+    changed = set()
+    for name, parts in KEY_PARTS.items():
+        if current[name] != previous[name]:
+            changed |= parts
+    return changed
+
+def ignored_directories(working_dir):
+    """Return the ignored directories (relative, '/'-separated) that are not watched."""
+    result = subprocess.run(
+        ['git', 'ls-files', '-z', '--others', '--ignored', '--exclude-standard', '--directory'],
+        cwd=working_dir, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    return {path.rstrip('/') for path in os.fsdecode(result.stdout).split('\0') if path.endswith('/')}
+
+def is_ignored(working_dir, path):
+    return subprocess.run(
+        ['git', 'check-ignore', '-q', path], cwd=working_dir,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    ).returncode == 0
+
+# --- Watch a repository for changes --- #
+class RepositoryWatcher:
+    """
+    Reports which parts of the status changed, using inotify.
+
+    Every directory of the working tree (except .git and ignored ones) is
+    watched, plus the top of .git and everything under refs. Events are
+    collected until none arrive for the debounce time, then on_change is
+    called once, on the watcher's thread, with the set of affected parts.
+    While nothing changes the thread sleeps in select() and uses no CPU.
+    """
+
+    def __init__(self, working_dir, git_dir, common_dir, on_change, debounce=WATCH_DEBOUNCE_MS / 1000):
+        self.working_dir = working_dir
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self.on_change = on_change
+        self.debounce = debounce
+        self.inotify = Inotify()
+        self.branch_name = read_head(git_dir, common_dir)[0]
+        self._git_roots = {git_dir, common_dir}
+        self._wake_read, self._wake_write = os.pipe()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='repository-watch', daemon=True)
+
+        try:
+            skipped = {os.path.join(working_dir, path) for path in ignored_directories(working_dir)}
+            self._add_tree(working_dir, skipped)
+            for root in self._git_roots:
+                self.inotify.add_directory(root)
+            self._add_tree(os.path.join(common_dir, 'refs'))
+        except OSError:
+            # E.g. the watch limit was reached
+            self.inotify.close()
+            os.close(self._wake_read)
+            os.close(self._wake_write)
+            raise
+
+    def _add_tree(self, top, skipped=()):
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            if not self.inotify.add_directory(directory):
+                continue
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False) and entry.name != '.git' and entry.path not in skipped:
+                    stack.append(entry.path)
+
+    def describe(self):
+        return f"inotify, {len(self.inotify)} directories"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopping = True
+        os.write(self._wake_write, b'x')
+        self._thread.join(timeout=1)
+        self.inotify.close()
+        os.close(self._wake_read)
+        os.close(self._wake_write)
+
+    def _parts_for_event(self, directory, name, mask):
+        if directory is None:
+            # The kernel dropped events, so anything may have changed
+            return set(ALL_PARTS)
+        path = os.path.join(directory, name) if name else directory
+        for root in self._git_roots:
+            if path == root or path.startswith(root + os.sep):
+                relative = os.path.relpath(path, root).replace(os.sep, '/')
+                if relative == 'HEAD':
+                    self.branch_name = read_head(self.git_dir, self.common_dir)[0]
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and relative.startswith('refs/'):
+                    # A new directory of refs, e.g. for a branch called feature/x
+                    self._add_tree(path)
+                return parts_for_git_path(relative, self.branch_name)
+
+        if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+            relative = os.path.relpath(path, self.working_dir)
+            if is_ignored(self.working_dir, relative):
+                return set()
+            self._add_tree(path)
+        return {TREE}
+
+    def _run(self):
+        pending = set()
+        first_event = last_event = None
+        while not self._stopping:
+            timeout = None
+            if pending:
+                deadline = min(last_event + self.debounce, first_event + MAX_DELAY_SECONDS)
+                timeout = max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self.inotify, self._wake_read], [], [], timeout)
+            if self._stopping:
+                return
+            if self.inotify in readable:
+                for directory, name, mask in self.inotify.read():
+                    parts = self._parts_for_event(directory, name, mask)
+                    if parts:
+                        pending |= parts
+                        last_event = time.monotonic()
+                        first_event = first_event or last_event
+            if pending and time.monotonic() >= min(last_event + self.debounce, first_event + MAX_DELAY_SECONDS):
+                # Quiet for the debounce time (or changing for too long): report everything collected
+                changed, pending = pending, set()
+                first_event = last_event = None
+                self.on_change(changed)
+
+class PollingWatcher:
+    """
+    Fallback for systems without inotify: checks .git every few seconds.
+
+    Only what git commands change (HEAD, the index, refs, config) is seen;
+    edits in the working tree show up once they are staged.
+    """
+
+    def __init__(self, working_dir, git_dir, common_dir, on_change, interval=WATCH_POLL_SECONDS):
+        self.git_dir = git_dir
+        self.common_dir = common_dir
+        self.on_change = on_change
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='repository-poll', daemon=True)
+
+    def describe(self):
+        return f"checking .git every {self.interval:g}s; working tree edits show once staged"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1)
+
+    def _run(self):
+        previous = watch_key(self.git_dir, self.common_dir)
+        while not self._stop.wait(self.interval):
+            current = watch_key(self.git_dir, self.common_dir)
+            changed = changed_parts(previous, current)
+            previous = current
+            if changed:
+                self.on_change(changed)
+
+def start_watcher(repo, on_change):
+    """Start an inotify watcher for repo, or a PollingWatcher where inotify is not available."""
+    working_dir, git_dir, common_dir = find_git_dirs(repo.working_tree_dir)
+    try:
+        return RepositoryWatcher(working_dir, git_dir, common_dir, on_change).start()
+    except OSError:
+        # No inotify here, or no watches left
+        return PollingWatcher(working_dir, git_dir, common_dir, on_change).start()
+
+# --- The status, re-read part by part --- #
+class LiveStatus:
+    """
+    The status screen's data for one branch, kept between redraws.
+
+    invalidate() marks parts as changed (usually from a watcher's
+    on_change); refresh() re-reads only those parts, so a saved file
+    costs one `git status` and a fetch one ahead/behind count. With
+    follow_head, a checkout of another branch switches to that branch.
+    """
+
+    def __init__(self, repo, branch_name, follow_head=False):
+        self.repo = repo
+        self.branch_name = branch_name
+        self.follow_head = follow_head
+        self.remote_url = None
+        self.latest_tag = None
+        self._tree = None
+        self._remote = None  # (ahead, behind, files_to_pull, commits_to_push)
+        self._remote_error = None
+        self._invalid = set(ALL_PARTS)
+        self._lock = threading.Lock()
+        self.last_refresh = {}  # part -> seconds it took the last time it was read
+
+    def invalidate(self, parts):
+        with self._lock:
+            self._invalid |= parts
+
+    @property
+    def is_stale(self):
+        """True if something changed since the last refresh()."""
+        return bool(self._invalid)
+
+    def refresh(self):
+        """Re-read the invalid parts and return the status as a RepoStatus."""
+        from src.utils import compare_branch_with_origin, get_origin_url
+
+        with self._lock:
+            invalid, self._invalid = self._invalid, set()
+        self.last_refresh = {}
+        for part in (INFO, TAG, TREE, REMOTE):
+            if part not in invalid:
+                continue
+            started = time.perf_counter()
+            try:
+                if part == INFO:
+                    self.remote_url = get_origin_url(self.repo)
+                    if self.follow_head and not self.repo.head.is_detached:
+                        self.branch_name = self.repo.active_branch.name
+                elif part == TAG:
+                    self.latest_tag = get_tag_index(self.repo).latest()
+                elif part == TREE:
+                    self._tree = get_repo_status(self.repo)
+                else:
+                    try:
+                        self._remote = compare_branch_with_origin(self.repo, self.branch_name)
+                        self._remote_error = None
+                    except Exception as e:
+                        self._remote, self._remote_error = None, f"Error comparing with the origin: {e}"
+            except Exception:
+                # Read this part (and any after it) again next time
+                self.invalidate(invalid)
+                raise
+            invalid.discard(part)
+            self.last_refresh[part] = time.perf_counter() - started
+
+        status = self._tree
+        status.latest_tag = self.latest_tag
+        status.error = self._remote_error
+        if self._remote:
+            status.ahead, status.behind, status.files_to_pull, status.commits_to_push = self._remote
+        return status
@@ -0,0 +1,39 @@
+# revisions.py
+
+from src.git_process import stream_git_records
+
+# --- List the files touched by a range of commits --- #
+def get_changed_files(repo, rev_range):
+    """
+    Return the deduplicated list of files changed by the commits in rev_range.
+
+    A single streamed `git log --name-only` pass replaces one diff per commit,
+    so the cost does not grow with the number of git invocations. Merge commits
+    are compared with their first parent, like Commit.stats.
+    """
+    records = stream_git_records(
+        repo, 'log', '--name-only', '--format=', '-z',
+        '--no-renames', '--diff-merges=first-parent', rev_range
+    )
+    # dict keeps the first-seen order while dropping duplicates
+    return list(dict.fromkeys(record for record in records if record))
+
+# --- Count how far two revisions have diverged --- #
+def count_ahead_behind(repo, local_ref, remote_ref):
+    """
+    Return (ahead, behind) for local_ref compared with remote_ref.
+
+    Uses one `git rev-list --left-right --count`, so no commit objects are
+    created however far the branches have drifted apart.
+    """
+    left, right = repo.git.rev_list('--left-right', '--count', f'{local_ref}...{remote_ref}').split()
+    return int(left), int(right)
+
+# --- Iterate over the first commits of a range --- #
+def iter_commits_limited(repo, rev_range, limit):
+    """
+    Lazily yield at most `limit` commits from rev_range, newest first.
+
+    Only the commits that are actually displayed are read from git.
+    """
+    return repo.iter_commits(rev_range, max_count=limit)
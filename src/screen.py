@@ -0,0 +1,135 @@
+# screen.py
+import io
+import os
+import re
+import sys
+import shutil
+from contextlib import contextmanager, redirect_stdout
+
+# SGR (colour) sequences and any other CSI escape sequence
+ANSI_SEQUENCE = re.compile(r'\033\[[0-9;?]*[A-Za-z]')
+
+CLEAR_SCREEN = '\033[H\033[2J\033[3J'  # Home, clear screen and scrollback
+CLEAR_LINE_END = '\033[K'
+CLEAR_BELOW = '\033[J'
+SAVE_CURSOR = '\0337'
+RESTORE_CURSOR = '\0338'
+
+def strip_ansi(text):
+    return ANSI_SEQUENCE.sub('', text)
+
+def is_plain_terminal(stream=None):
+    """True when stream should get neither colours nor cursor movement."""
+    from src.config import PLAIN_OUTPUT
+    stream = stream or sys.stdout
+    if PLAIN_OUTPUT or 'NO_COLOR' in os.environ or os.environ.get('TERM') == 'dumb':
+        return True
+    isatty = getattr(stream, 'isatty', None)
+    return not (isatty and isatty())
+
+def _enable_windows_ansi():
+    # An empty command switches the Windows 10+ console into VT mode
+    if os.name == 'nt':
+        os.system('')
+
+@contextmanager
+def capture_output():
+    """Collect everything printed inside the block, e.g. to build a frame."""
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        yield buffer
+
+class PlainTextStream:
+    """Wraps a text stream and removes ANSI sequences from everything written to it."""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        return self._stream.write(strip_ansi(text))
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+def use_plain_output():
+    """Strip colours from everything written to stdout and the log from now on."""
+    import logging
+    sys.stdout = PlainTextStream(sys.stdout)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(PlainTextStream(handler.stream))
+
+class ScreenRenderer:
+    """
+    Draws the menu as whole frames.
+
+    A frame is built in memory and written with a single write. When the
+    previous frame is still on screen, only the lines that changed are
+    rewritten in place. In plain mode frames are written one after another
+    without colour or cursor movement.
+    """
+
+    def __init__(self, stream=None, plain=None):
+        self.stream = stream or sys.stdout
+        self.plain = is_plain_terminal(self.stream) if plain is None else plain
+        self._lines = None  # The frame currently on screen, or None if unknown
+        if not self.plain:
+            _enable_windows_ansi()
+
+    def invalidate(self):
+        """Forget the frame on screen, e.g. after other output, so the next draw clears it."""
+        self._lines = None
+
+    def draw(self, text, keep_cursor=False):
+        """
+        Show text as the new frame.
+
+        With keep_cursor the cursor is left where it was (e.g. at a prompt)
+        when the changed lines can be updated in place. Returns False if the
+        screen had to be cleared instead, so the caller must redraw anything
+        that followed the frame.
+        """
+        if text.endswith('\n'):
+            text = text[:-1]
+        lines = text.split('\n')
+
+        if self.plain:
+            self.stream.write(strip_ansi(text) + '\n')
+            self.stream.flush()
+            return not keep_cursor
+
+        in_place = self._can_update(lines, keep_cursor)
+        if in_place:
+            output = self._changed_lines(lines, keep_cursor)
+        else:
+            output = CLEAR_SCREEN + text + '\n'
+        self._lines = lines
+        self.stream.write(output)
+        self.stream.flush()
+        return in_place
+
+    def _can_update(self, lines, keep_cursor):
+        previous = self._lines
+        if previous is None:
+            return False
+        if keep_cursor and len(lines) != len(previous):
+            # Whatever follows the frame (the prompt) would have to move
+            return False
+        columns, rows = shutil.get_terminal_size()
+        # Wrapped or scrolled lines no longer sit on the row we expect
+        if max(len(lines), len(previous)) + 3 > rows:
+            return False
+        return all(len(strip_ansi(line)) < columns for line in lines)
+
+    def _changed_lines(self, lines, keep_cursor):
+        previous = self._lines
+        parts = [SAVE_CURSOR] if keep_cursor else []
+        for row, line in enumerate(lines, start=1):
+            if row > len(previous) or previous[row - 1] != line:
+                parts.append(f'\033[{row};1H{line}{CLEAR_LINE_END}')
+        if not keep_cursor:
+            # Drop the old prompt and anything typed below the frame
+            parts.append(f'\033[{len(lines) + 1};1H{CLEAR_BELOW}')
+        else:
+            parts.append(RESTORE_CURSOR)
+        return ''.join(parts)
@@ -0,0 +1,159 @@
+# status_cache.py
+import os
+import time
+
+from src.git_status import RepoStatus
+from src.tag_index import get_tags_signature
+from src.cache import CACHE_DIR_NAME, read_cache_file, write_cache_file, stat_signature
+
+STATUS_CACHE_FILE = 'status.json'
+STATUS_CACHE_VERSION = 1
+
+# What this process last wrote for each git_dir, so an unchanged status is not written again
+_last_saved = {}
+
+class StatusSnapshot:
+    """What the menu showed the last time it read the repository."""
+    __slots__ = ('git_dir', 'working_dir', 'remote_url', 'branch', 'latest_tag', 'status', 'saved_at')
+
+    def __init__(self, git_dir, working_dir, remote_url, branch, latest_tag, status, saved_at):
+        self.git_dir = git_dir
+        self.working_dir = working_dir
+        self.remote_url = remote_url
+        self.branch = branch
+        self.latest_tag = latest_tag
+        self.status = status  # RepoStatus, as compare_with_origin returned it
+        self.saved_at = saved_at
+
+# --- Find the repository without running git --- #
+def find_git_dirs(path):
+    """
+    Return (working_dir, git_dir, common_dir) for the repository containing
+    path, or None. A .git file (worktrees, submodules) is followed.
+    """
+    path = os.path.abspath(path)
+    while True:
+        dot_git = os.path.join(path, '.git')
+        if os.path.isdir(dot_git):
+            git_dir = dot_git
+            break
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git, 'r', encoding='utf-8') as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if not line.startswith('gitdir:'):
+                return None
+            git_dir = os.path.normpath(os.path.join(path, line[len('gitdir:'):].strip()))
+            break
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+    common_dir = git_dir
+    try:
+        with open(os.path.join(git_dir, 'commondir'), 'r', encoding='utf-8') as f:
+            common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        pass
+    return path, git_dir, common_dir
+
+# --- Read refs straight from .git --- #
+def read_ref(common_dir, refname):
+    """Return the object id refname points at (loose or packed), or None."""
+    try:
+        with open(os.path.join(common_dir, *refname.split('/')), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(common_dir, 'packed-refs'), 'r', encoding='utf-8') as f:
+            suffix = f' {refname}\n'
+            for line in f:
+                if line.endswith(suffix):
+                    return line.split(' ', 1)[0]
+    except OSError:
+        pass
+    return None
+
+def read_head(git_dir, common_dir):
+    """Return (branch name or None when detached, commit id or None when unborn)."""
+    try:
+        with open(os.path.join(git_dir, 'HEAD'), 'r', encoding='utf-8') as f:
+            head = f.read().strip()
+    except OSError:
+        return None, None
+    if not head.startswith('ref: '):
+        return None, head
+    refname = head[len('ref: '):]
+    branch = refname[len('refs/heads/'):] if refname.startswith('refs/heads/') else None
+    return branch, read_ref(common_dir, refname)
+
+def status_key(git_dir, common_dir):
+    """
+    Return the state a cached status is valid for: HEAD, the index, the
+    remote-tracking branch, the tags and the config (for the origin URL).
+
+    Only files in .git are looked at. Edits in the working tree that were
+    not staged do not change the key; they show up with the refresh that
+    follows every cached first screen.
+    """
+    branch, head_oid = read_head(git_dir, common_dir)
+    return {
+        'branch': branch,
+        'head': head_oid,
+        'upstream': read_ref(common_dir, f'refs/remotes/origin/{branch}') if branch else None,
+        'index': stat_signature(os.path.join(git_dir, 'index')),
+        'tags': get_tags_signature(common_dir),
+        'config': stat_signature(os.path.join(common_dir, 'config')),
+    }
+
+# --- Load and save the snapshot --- #
+def _cache_path(git_dir):
+    # Per worktree, since each has its own HEAD and index
+    return os.path.join(git_dir, CACHE_DIR_NAME, STATUS_CACHE_FILE)
+
+def load_status_snapshot(path):
+    """Return the StatusSnapshot for the repository containing path if it is still valid, else None."""
+    dirs = find_git_dirs(path)
+    if dirs is None:
+        return None
+    _, git_dir, common_dir = dirs
+    cached = read_cache_file(_cache_path(git_dir))
+    if not cached or cached.get('version') != STATUS_CACHE_VERSION:
+        return None
+    if cached.get('key') != status_key(git_dir, common_dir):
+        return None
+    try:
+        status = RepoStatus.from_dict(cached['status'])
+        return StatusSnapshot(git_dir, cached['working_dir'], cached['remote_url'], cached['branch'],
+                              cached['latest_tag'], status, cached['saved_at'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def save_status_snapshot(repo, branch_name, latest_tag, status, remote_url):
+    """
+    Store what the menu is about to show, for the next run's first screen.
+
+    Nothing is written when the key and the status are the same as the last
+    time this process saved them, e.g. for a redraw after a fetch that
+    brought nothing new.
+    """
+    git_dir, common_dir = repo.git_dir, repo.common_dir
+    # Taken after the status was read, as `git status` may have refreshed the index
+    snapshot = {
+        'version': STATUS_CACHE_VERSION,
+        'key': status_key(git_dir, common_dir),
+        'working_dir': repo.working_tree_dir,
+        'remote_url': remote_url,
+        'branch': branch_name,
+        'latest_tag': latest_tag,
+        'status': status.to_dict(),
+    }
+    if _last_saved.get(git_dir) == snapshot:
+        return
+    os.makedirs(os.path.dirname(_cache_path(git_dir)), exist_ok=True)
+    write_cache_file(_cache_path(git_dir), dict(snapshot, saved_at=time.time()))
+    _last_saved[git_dir] = snapshot
@@ -1,13 +1,8 @@
 # tag.py
 
-from git import Repo, exc
 import os
 import sys
-import git
-from git import Repo
 import logging
-import semver
-from semver import VersionInfo
 import datetime
 import tempfile
 import shutil
@@ -16,6 +11,10 @@ from src.utils import (
     setup_logging,
     get_uncommitted_changes,
 )
+from src.tag_index import get_tag_index
+from src.git_process import stream_git_chunks
+from src.release_notes import format_release_notes
+from src.git_errors import classify_git_error, REJECTED
 
 from src.config import (
     BOLD_TEXT,
@@ -33,6 +32,8 @@ from src.config import (
     PROGRAM_HELP_TEXT,
     PROGRAM_VERSION,
     PROGRAM_DATE,
+    CHANGELOG_DIFF_MAX_BYTES,
+    CHANGELOG_COPY_CHUNK_BYTES,
 )
 
 logger = setup_logging()
@@ -44,12 +45,28 @@ def get_user_choice():
     # The function then returns the user’s input as a string
     return input(f"\n{QUESTION_TEXT}Enter the number of your choice: {RESET_TEXT}")
 
-def tag_version(repo, latest_tag):
+VERSION_BUMPS = {'major': '1', 'minor': '2', 'patch': '3'}
+
+def tag_version(repo, bump=None, changes=None):
+    """
+    Create, record and push the next semantic version tag.
+
+    Prompts for the version bump and the changelog notes unless bump
+    ('major', 'minor' or 'patch') and changes are given. Returns True once
+    the tag has been pushed.
+    """
+    from git import exc
+    from semver import VersionInfo
+
     if repo.is_dirty():
         logger.error(f"{ERROR_TEXT}Uncommitted changes detected. Please commit your changes before tagging a new version.{RESET_TEXT}")
-        return
+        return False
 
-    current_version = VersionInfo.parse(latest_tag if latest_tag != "No tags available" else '0.0.0')
+    # Read the current version from the tag index rather than from the
+    # screen, which may be stale
+    tag_index = get_tag_index(repo)
+    latest_tag = tag_index.latest()
+    current_version = VersionInfo.parse(latest_tag if latest_tag else '0.0.0')
     logger.info(f"{OUTPUT_TEXT}Current version: {ANSWER_TEXT}{current_version}{RESET_TEXT}")
 
     version_choices = [
@@ -58,10 +75,12 @@ def tag_version(repo, latest_tag):
         "3. Increment patch version",
         "4. Exit without tagging"
     ]
-    for choice in version_choices:
-        logger.info(f"{OUTPUT_TEXT}{choice}{RESET_TEXT}")
-
-    version_choice = input(f"{QUESTION_TEXT}Enter the number of your choice: {RESET_TEXT}")
+    if bump is None:
+        for choice in version_choices:
+            logger.info(f"{OUTPUT_TEXT}{choice}{RESET_TEXT}")
+        version_choice = input(f"{QUESTION_TEXT}Enter the number of your choice: {RESET_TEXT}")
+    else:
+        version_choice = VERSION_BUMPS.get(bump)
 
     if version_choice == '1':
         new_version = current_version.bump_major()
@@ -71,66 +90,122 @@ def tag_version(repo, latest_tag):
         new_version = current_version.bump_patch()
     elif version_choice == '4':
         logger.info(f"{ANSWER_TEXT}Exiting without tagging.{RESET_TEXT}")
-        return
+        return False
     else:
         logger.error(f"{ERROR_TEXT}Invalid choice. Please enter a number between 1 and 4.{RESET_TEXT}")
-        return
-
-    diff = repo.git.diff('HEAD~1', '--unified=0')
+        return False
 
+    if str(new_version) in tag_index:
+        logger.error(f"{ERROR_TEXT}Tag {new_version} already exists.{RESET_TEXT}")
+        return False
     # Create the tag locally without a message
     repo.create_tag(str(new_version))
 
-    # Update the changelog
-    update_changelog(new_version, diff)
+    # Update the changelog with release notes since the previous tag; the
+    # diff is streamed into it from git
+    update_changelog(new_version, repo, latest_tag, changes)
 
-    # Commit changelog update
+    # Commit the changelog update; staged by name, since a new CHANGELOG.md is
+    # untracked and repo.is_dirty() does not see untracked files
+    if os.path.exists(os.path.join(repo.working_tree_dir, 'CHANGELOG.md')):
+        repo.git.add('--', 'CHANGELOG.md')
     if repo.is_dirty():
-        repo.git.add('-A')
         repo.git.commit('-m', f"Update changelog for version {new_version}")
 
     try:
-        # Push commits and tags to remote repository
-        repo.git.push('origin', 'HEAD')
-        repo.git.push('origin', '--tags')
+        # Push the branch and only the new tag in one atomic push, so either
+        # both refs are updated on the remote or neither is
+        repo.git.push('--atomic', 'origin', 'HEAD', f'refs/tags/{new_version}')
         logger.info(f"{ANSWER_TEXT}Tag {new_version} has been pushed to the remote repository.{RESET_TEXT}")
-    except git.exc.GitCommandError as e:
-        logger.error(f"{ERROR_TEXT}Error pushing tag to remote: {e}{RESET_TEXT}")
+        return True
+    except exc.GitCommandError as e:
+        if classify_git_error(e) == REJECTED:
+            # Fetches bring only the branch, so the tag may exist only on origin;
+            # git names each refused ref, e.g. "! [rejected] 1.2.0 -> 1.2.0 (already exists)"
+            refused = [line.strip() for line in str(e.stderr).splitlines() if line.strip().startswith('!')]
+            logger.error(f"{ERROR_TEXT}The origin rejected the push:\n" + '\n'.join(refused) + RESET_TEXT)
+            logger.error(f"{ERROR_TEXT}Tag {new_version} was created only locally; remove it with `git tag -d {new_version}` before trying again.{RESET_TEXT}")
+        else:
+            logger.error(f"{ERROR_TEXT}Error pushing tag to remote: {e}{RESET_TEXT}")
+        return False
+
+# --- Stream the diff of the last commit into the change log --- #
+def get_diff_base(repo):
+    """Return HEAD~1, or the empty tree when HEAD is the first commit."""
+    if repo.head.commit.parents:
+        return 'HEAD~1'
+    return repo.git.hash_object('-t', 'tree', os.devnull)
+
+def write_changelog_diff(temp, repo, max_bytes=CHANGELOG_DIFF_MAX_BYTES):
+    """
+    Copy `git diff HEAD~1 HEAD --unified=0` into temp chunk by chunk.
+
+    If the diff grows past max_bytes, what was written is discarded and a
+    diffstat is written instead, so neither memory nor the changelog grow
+    with the size of the release.
+    """
+    diff_start = temp.tell()
+    written = 0
+    last_chunk = b''
+    base = get_diff_base(repo)
+    chunks = stream_git_chunks(repo, 'diff', base, 'HEAD', '--unified=0')
+    for chunk in chunks:
+        written += len(chunk)
+        if written > max_bytes:
+            chunks.close()
+            break
+        temp.write(chunk)
+        last_chunk = chunk
+    else:
+        if last_chunk and not last_chunk.endswith(b'\n'):
+            temp.write(b'\n')
+        return
 
-# --- Update the change log ---#
-def get_repo_root():
-    """Get the root directory of the git repository."""
-    repo = Repo(os.getcwd(), search_parent_directories=True)
-    return repo.git.rev_parse("--show-toplevel")
+    # Too large: replace the partial diff with a summary of the changed files
+    temp.seek(diff_start)
+    temp.truncate()
+    temp.write(f"Diff larger than {max_bytes} bytes, showing the diffstat only.\n\n".encode())
+    for chunk in stream_git_chunks(repo, 'diff', '--stat', base, 'HEAD'):
+        temp.write(chunk)
 
 # --- Add a diff and comment to the change log --- #
-def update_changelog(version, diff):
-    repo_root = get_repo_root()
+def update_changelog(version, repo, previous_tag=None, changes_input=None):
+    repo_root = repo.working_tree_dir
     changelog_path = os.path.join(repo_root, 'CHANGELOG.md')
     temp_file = os.path.join(repo_root, "CHANGELOG_TEMP.md")
     
     try:
-        with open(temp_file, 'w') as temp:
+        # Written in binary so the diff can be copied from git without decoding it
+        with open(temp_file, 'wb') as temp:
             # Check if CHANGELOG.md exists in the repo root
-            if os.path.exists(changelog_path):
-                with open(changelog_path, 'r') as original:
-                    # Write the new changelog entry at the top
-                    temp.write(f"\n## {version} - {datetime.datetime.now().strftime('%Y-%m-%d')}\n")
-                    
-                    # Ask for changes with a semicolon delimiter
-                    changes_input = input(f"{QUESTION_TEXT}Enter the changes included in this version (separate multiple changes with ';'): {RESET_TEXT}")
-                    changes = changes_input.split(';')
-                    
-                    for change in changes:
-                        temp.write(f"- {change.strip()}\n")
-                    temp.write(f"\n### Diff:\n```\n{diff}\n```\n\n")
-                    
-                    # Copy the rest of the original changelog
-                    temp.write(original.read())
-            else:
+            exists = os.path.exists(changelog_path)
+            if not exists:
                 print(f"{ANSWER_TEXT}CHANGELOG.md not found in the repository root. Creating a new one.{RESET_TEXT}")
-                temp.write(f"\n## {version} - {datetime.datetime.now().strftime('%Y-%m-%d')}\n")
-        
+
+            # Write the new changelog entry at the top
+            temp.write(f"\n## {version} - {datetime.datetime.now().strftime('%Y-%m-%d')}\n".encode())
+
+            # Ask for changes with a semicolon delimiter
+            if changes_input is None:
+                changes_input = input(f"{QUESTION_TEXT}Enter the changes included in this version (separate multiple changes with ';'): {RESET_TEXT}")
+            changes = changes_input.split(';')
+
+            for change in changes:
+                if change.strip():
+                    temp.write(f"- {change.strip()}\n".encode())
+
+            # Commits since the previous tag (the whole history for the first release), grouped by type
+            temp.write(format_release_notes(repo, previous_tag).encode())
+
+            temp.write(b"\n### Diff:\n```\n")
+            write_changelog_diff(temp, repo)
+            temp.write(b"```\n\n")
+
+            if exists:
+                # Copy the rest of the original changelog in fixed-size chunks
+                with open(changelog_path, 'rb') as original:
+                    shutil.copyfileobj(original, temp, CHANGELOG_COPY_CHUNK_BYTES)
+
         # Replace the original changelog with the temporary one
         shutil.move(temp_file, changelog_path)
         print(f"{ANSWER_TEXT}CHANGELOG.md in the repository root has been updated with version {version} and associated changes.{RESET_TEXT}")
@@ -148,7 +223,7 @@ def update_changelog(version, diff):
         elif choice == UserChoice.ADD.value[0]:
             add_files(repo)
         elif choice == UserChoice.TAG.value[0]:
-            tag_version(repo, latest_tag)
+            tag_version(repo)
             latest_tag = str(max(repo.tags, key=lambda t: semver.VersionInfo.parse(t.name)) if repo.tags else "No tags available")
         elif choice == UserChoice.EXIT.value[0]:
             logger.info(f"{ANSWER_TEXT}Exiting the program. Goodbye!{RESET_TEXT}")
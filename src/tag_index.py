@@ -0,0 +1,137 @@
+# tag_index.py
+import os
+from bisect import bisect_left, bisect_right
+
+from src.git_process import stream_git_records
+from src.cache import (
+    get_cache_dir,
+    read_cache_file,
+    write_cache_file,
+    stat_signature,
+    tree_signature,
+)
+
+TAG_INDEX_FILE = 'tag-index.json'
+TAG_INDEX_VERSION = 1
+
+# Indexes already loaded in this process, keyed by the repository's common dir
+_loaded_indexes = {}
+
+class TagIndex:
+    """
+    Semantic version tags of a repository, sorted by semver precedence.
+
+    Tags that are not valid semantic versions are skipped and only counted.
+    """
+
+    def __init__(self, entries, skipped=0):
+        # entries: [name, major, minor, patch, prerelease, build] in ascending order
+        self._entries = entries
+        self._names = {entry[0] for entry in entries}
+        self._majors = [entry[1] for entry in entries]
+        self.skipped = skipped
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, tag_name):
+        return tag_name in self._names
+
+    def latest(self):
+        """Return the highest semver tag name, or None if there are none."""
+        return self._entries[-1][0] if self._entries else None
+
+    def latest_in_major(self, major):
+        """Return the highest tag name with the given major version, or None."""
+        position = bisect_right(self._majors, major)
+        if position and self._majors[position - 1] == major:
+            return self._entries[position - 1][0]
+        return None
+
+    def in_range(self, lower=None, upper=None):
+        """Return tag names with lower <= version < upper, in ascending order."""
+        start = 0 if lower is None else bisect_left(self._entries, _parse(lower), key=_entry_version)
+        end = len(self._entries) if upper is None else bisect_left(self._entries, _parse(upper), key=_entry_version)
+        return [entry[0] for entry in self._entries[start:end]]
+
+    def to_dict(self):
+        return {'entries': self._entries, 'skipped': self.skipped}
+
+def _parse(version):
+    import semver
+    return version if isinstance(version, semver.VersionInfo) else semver.VersionInfo.parse(str(version))
+
+def _precedence_key(version):
+    """Return a tuple that sorts like semver precedence, much faster to compare than VersionInfo."""
+    if version.prerelease is None:
+        # A release ranks above all of its pre-releases
+        return version.major, version.minor, version.patch, 1, ()
+    identifiers = tuple(
+        (0, int(part), '') if part.isdigit() else (1, 0, part)
+        for part in version.prerelease.split('.')
+    )
+    return version.major, version.minor, version.patch, 0, identifiers
+
+def _entry_version(entry):
+    import semver
+    return semver.VersionInfo(*entry[1:])
+
+# --- Load the tag index, rebuilding it only when tags change --- #
+def get_tag_index(repo):
+    """
+    Return the TagIndex for repo.
+
+    The index is stored in .git/git-helper and reused until packed-refs or
+    anything under refs/tags changes.
+    """
+    common_dir = repo.common_dir
+    signature = get_tags_signature(common_dir)
+
+    loaded = _loaded_indexes.get(common_dir)
+    if loaded and loaded[0] == signature:
+        return loaded[1]
+
+    index_path = os.path.join(get_cache_dir(repo), TAG_INDEX_FILE)
+    cached = read_cache_file(index_path)
+    if cached and cached.get('version') == TAG_INDEX_VERSION and cached.get('signature') == signature:
+        index = TagIndex(cached['entries'], cached['skipped'])
+    else:
+        index = build_tag_index(repo)
+        write_cache_file(index_path, {'version': TAG_INDEX_VERSION, 'signature': signature, **index.to_dict()})
+
+    _loaded_indexes[common_dir] = (signature, index)
+    return index
+
+def build_tag_index(repo):
+    """Build a TagIndex from a single `git for-each-ref` call."""
+    import semver
+
+    entries = []
+    skipped = 0
+    # Left in git's default refname order: semver precedence is sorted below
+    records = stream_git_records(
+        repo, 'for-each-ref', '--format=%(refname)', 'refs/tags',
+        separator=b'\n'
+    )
+    for refname in records:
+        name = refname[len('refs/tags/'):]
+        try:
+            version = semver.VersionInfo.parse(name)
+        except ValueError:
+            # Not a semantic version tag, e.g. 'latest' or 'v1.0'
+            skipped += 1
+            continue
+        entries.append((version, name))
+
+    entries.sort(key=lambda entry: _precedence_key(entry[0]))
+    return TagIndex(
+        [[name, v.major, v.minor, v.patch, v.prerelease, v.build] for v, name in entries],
+        skipped,
+    )
+
+def get_tags_signature(common_dir):
+    """Return a fingerprint of the repository's tags that changes when any tag does."""
+    return [
+        stat_signature(os.path.join(common_dir, 'packed-refs')),
+        tree_signature(os.path.join(common_dir, 'refs', 'tags')),
+    ]
@@ -0,0 +1,191 @@
+# trace.py
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+
+# Subcommands that talk to the remote
+NETWORK_COMMANDS = {'fetch', 'pull', 'push', 'ls-remote', 'clone'}
+
+# Frames from these files are skipped when looking for the caller of a git command
+_TRACE_FILES = {os.path.abspath(__file__), os.path.join(os.path.dirname(os.path.abspath(__file__)), 'git_process.py')}
+
+_tracer = None
+_local = threading.local()
+
+class Span:
+    """One git command: what ran, who asked for it, how long it took and how much it printed."""
+    __slots__ = ('argv', 'category', 'start', 'duration', 'bytes_read', 'caller', 'thread')
+
+    def __init__(self, argv, category, start, duration, bytes_read, caller, thread):
+        self.argv = argv
+        self.category = category  # 'git' or 'network'
+        self.start = start        # Seconds since tracing started
+        self.duration = duration  # Seconds, or None for a process whose end was not seen
+        self.bytes_read = bytes_read
+        self.caller = caller
+        self.thread = thread
+
+    @property
+    def command(self):
+        return ' '.join(str(arg) for arg in self.argv)
+
+class Tracer:
+    """Collects a Span for every git command run while tracing is enabled."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def record(self, argv, started, duration, bytes_read, thread=None, caller=None):
+        """Add a span for a command that started at perf_counter() time started."""
+        argv = [str(arg) for arg in argv]
+        span = Span(
+            argv,
+            'network' if _subcommand(argv) in NETWORK_COMMANDS else 'git',
+            started - self.origin,
+            duration,
+            bytes_read,
+            caller or find_caller(sys._getframe(1)),
+            thread if thread is not None else threading.current_thread().name,
+        )
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def mark(self):
+        """Return a position in the timeline, for since()."""
+        return len(self.spans)
+
+    def since(self, mark):
+        """Return the spans recorded after mark."""
+        with self._lock:
+            return self.spans[mark:]
+
+    def to_chrome_trace(self):
+        """Return the spans in Chrome's Trace Event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        thread_ids = {}
+        events = []
+        for span in self.spans:
+            tid = thread_ids.setdefault(span.thread, len(thread_ids) + 1)
+            event = {
+                'name': f"git {_subcommand(span.argv) or ''}".strip(),
+                'cat': span.category,
+                'ts': round(span.start * 1e6, 1),
+                'pid': pid,
+                'tid': tid,
+                'args': {'command': span.command, 'caller': span.caller, 'bytes_read': span.bytes_read},
+            }
+            if span.duration is None:
+                event.update(ph='i', s='t')
+            else:
+                event.update(ph='X', dur=round(span.duration * 1e6, 1))
+            events.append(event)
+        for name, tid in thread_ids.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path):
+        with open(path, 'w', encoding='utf-8') as trace_file:
+            json.dump(self.to_chrome_trace(), trace_file)
+
+def _subcommand(argv):
+    # Skip 'git' and global options such as '-c key=value' or '--literal-pathspecs'
+    args = iter(argv[1:])
+    for arg in args:
+        if arg == '-c':
+            next(args, None)
+        elif not arg.startswith('-'):
+            return arg
+    return None
+
+def find_caller(frame):
+    """Return 'module.function' for the first frame from frame outwards that is not GitPython or tracing code."""
+    import_root = _gitpython_root()
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename not in _TRACE_FILES and not (import_root and filename.startswith(import_root)) \
+                and 'contextlib' not in filename and 'asyncio' not in filename:
+            return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return '?'
+
+def _gitpython_root():
+    module = sys.modules.get('git')
+    return os.path.dirname(os.path.abspath(module.__file__)) + os.sep if module else None
+
+# --- Turn tracing on --- #
+def get_tracer():
+    """Return the active Tracer, or None when tracing is off."""
+    return _tracer
+
+def enable_tracing(export_path=None):
+    """
+    Start recording git commands.
+
+    Every Repo created from now on runs its commands through TracedGit. With
+    export_path, the timeline is written there as Chrome-trace JSON on exit.
+    """
+    global _tracer
+    if _tracer is None:
+        from git import Repo
+        _tracer = Tracer()
+        Repo.GitCommandWrapperType = _traced_git_class()
+    if export_path:
+        atexit.register(_tracer.export, export_path)
+    return _tracer
+
+@contextmanager
+def streaming():
+    """Mark a block where a stream helper records its own span, so TracedGit does not."""
+    _local.streaming = True
+    try:
+        yield
+    finally:
+        _local.streaming = False
+
+_traced_git = None
+
+def _traced_git_class():
+    global _traced_git
+    if _traced_git is None:
+        from git import Git
+
+        class TracedGit(Git):
+            """Git command wrapper that records a Span for every command it runs."""
+
+            def execute(self, command, *args, **kwargs):
+                tracer = _tracer
+                if tracer is None:
+                    return super().execute(command, *args, **kwargs)
+                argv = command if isinstance(command, (list, tuple)) else [command]
+                started = time.perf_counter()
+                if kwargs.get('as_process'):
+                    # The caller reads the output itself, so only the start is known
+                    process = super().execute(command, *args, **kwargs)
+                    if not getattr(_local, 'streaming', False):
+                        tracer.record(argv, started, None, 0)
+                    return process
+                result = None
+                try:
+                    result = super().execute(command, *args, **kwargs)
+                    return result
+                finally:
+                    tracer.record(argv, started, time.perf_counter() - started, _output_size(result))
+
+        _traced_git = TracedGit
+    return _traced_git
+
+def _output_size(result):
+    if isinstance(result, tuple):
+        return sum(_output_size(part) for part in result[1:])
+    if isinstance(result, bytes):
+        return len(result)
+    if isinstance(result, str):
+        return len(result.encode('utf-8', errors='surrogateescape'))
+    return 0
@@ -1,9 +1,14 @@
 import os
 import logging
-from git import Repo, exc
-import semver
 import re
 
+from src.git_status import get_repo_status, RepoStatus
+from src.tag_index import get_tag_index
+from src.revisions import (
+    get_changed_files,
+    count_ahead_behind,
+    iter_commits_limited,
+)
 from src.config import (
     BOLD_TEXT,
     UNDERLINE_TEXT,
@@ -20,35 +25,21 @@ from src.config import (
     PROGRAM_HELP_TEXT,
     PROGRAM_VERSION,
     PROGRAM_DATE,
+    MAX_COMMITS_DISPLAYED,
 )
 
 def setup_logging():
     logging.basicConfig(level=logging.INFO, format='%(message)s')
     return logging.getLogger(__name__)
 
-def get_repo_root():
-    try:
-        repo = Repo(os.getcwd(), search_parent_directories=True)
-        return repo.git.rev_parse("--show-toplevel")
-    except Exception as e:
-        raise Exception(f"Error finding Git repository root: {e}")
-
 def initialize_repository():
+    from git import Repo, exc
     repo_path = os.getcwd()
     try:
         repo = Repo(repo_path, search_parent_directories=True)
         branch_name = repo.active_branch.name
-        if repo.tags:
-            try:
-                latest_tag = max(
-                    repo.tags,
-                    key=lambda t: semver.VersionInfo.parse(t.name)
-                )
-                latest_tag_str = str(latest_tag)
-            except Exception:
-                latest_tag_str = str(sorted(repo.tags, key=lambda t: t.name)[-1])
-        else:
-            latest_tag_str = "No tags available"
+        # Latest semver tag from the cached tag index (non-semver tags are skipped), None without one
+        latest_tag_str = get_tag_index(repo).latest()
     except exc.InvalidGitRepositoryError:
         # Instead of raising, return None values
         return None, None, None
@@ -57,7 +48,16 @@ def initialize_repository():
         return None, None, None
     return repo, branch_name, latest_tag_str
 
+def get_origin_url(repo):
+    """Return the URL of origin, or None when the repository has no origin remote."""
+    try:
+        return repo.remotes.origin.url
+    except AttributeError:
+        return None
+
 def get_org_and_repo_name(remote_url):
+    if remote_url is None:
+        return None, None
     remote_url = remote_url.replace('.git', '')
     match = re.search(r'[:/](?P<org>[^/]+)/(?P<repo>[^/]+)$', remote_url)
     if match:
@@ -66,87 +66,53 @@ def get_org_and_repo_name(remote_url):
 
 # --- Get uncommited changes --- #
 def get_uncommitted_changes(repo):
-    messages = ""
-
-    # Get modified but not staged files
-    unstaged_files = repo.git.diff('--name-only').splitlines()
-
-    # Get staged but not yet committed files
-    staged_files = repo.git.diff('--cached', '--name-only').splitlines()
-
-    # Get newly added (untracked) files
-    untracked_files = repo.untracked_files
-
-    if staged_files:
-        formatted_staged_files = '\n'.join([f"{OUTPUT_TEXT}  Modified (staged): {file}{RESET_TEXT}" for file in staged_files])
-        messages += f"\n{ANSWER_TEXT}{UNDERLINE_TEXT}Changes ready to be committed:{RESET_TEXT}\n{formatted_staged_files}{RESET_TEXT}\n\n"
-        messages += f"{HELP_TEXT}Guidance: Consider {WARNING_TEXT}(4.)COMMITTING{RESET_TEXT} your changes.{RESET_TEXT}\n"
-        messages += f"{HELP_TEXT}>    These files have been added to the staging area and are ready for your next commit.{RESET_TEXT}\n"
-        messages += f"{HELP_TEXT}>    You shouldn't change these files any further until you commit them.{RESET_TEXT}\n"
-        messages += f"{HELP_TEXT}>    Once committed, these files can be pushed to the origin repository.{RESET_TEXT}\n\n"
-
-    if unstaged_files:
-        formatted_unstaged_files = '\n'.join([f"{OUTPUT_TEXT}  Modified (not staged): {file}{RESET_TEXT}" for file in unstaged_files])
-        messages += f"\n{ANSWER_TEXT}{UNDERLINE_TEXT}Files not yet added to staging:{RESET_TEXT}\n{formatted_unstaged_files}{RESET_TEXT}\n\n"
-        messages += f"{HELP_TEXT}Guidance: Consider {WARNING_TEXT}(3.)ADDING{RESET_TEXT} the changed files to staging.{RESET_TEXT}\n"
-        messages += f"{HELP_TEXT}>    These files have been changed since the last commit, but are not yet staged.{RESET_TEXT}\n"
-        messages += f"{HELP_TEXT}>    Only add files that are ready to be staged and then committed to the repository.{RESET_TEXT}\n"
-        messages += f"{HELP_TEXT}>    When added, the files will be staged and ready to commit.{RESET_TEXT}\n\n"
-
-    if untracked_files:
-        formatted_untracked_files = '\n'.join([f"{OUTPUT_TEXT}  New file (untracked): {file}{RESET_TEXT}" for file in untracked_files])
-        messages += f"\n{ANSWER_TEXT}{UNDERLINE_TEXT}Untracked files not yet added to staging:{RESET_TEXT}\n{formatted_untracked_files}{RESET_TEXT}\n\n"
-        messages += f"{HELP_TEXT}Guidance: Consider {WARNING_TEXT}(3.)ADDING{RESET_TEXT} the new files to staging.{RESET_TEXT}\n"
-        messages += f"{HELP_TEXT}>    These files are recognized by Git, but are not yet part of version control.{RESET_TEXT}\n"
-        messages += f"{HELP_TEXT}>    Only add files that are ready to be staged and then committed to the repository.{RESET_TEXT}\n"
-        messages += f"{HELP_TEXT}>    When added, the files will be staged and ready to commit.{RESET_TEXT}\n\n"
-    
-    return messages
+    """Return a RepoStatus with the staged, unstaged, untracked and conflicted files."""
+    return get_repo_status(repo)
 
 #--- Compare the local repository with the remote origin ---#
 def compare_with_origin(repo, branch_name):
+    """
+    Return a RepoStatus with the working tree changes plus how the branch
+    compares with origin/<branch_name>. Errors are recorded on status.error.
+    """
+    status = RepoStatus(branch=branch_name)
     try:
-        # Fetch the latest changes from the remote origin
-        repo.remotes.origin.fetch()
-
-        # Initialize a string for the messages
-        messages = ''
-
-        # Check if the local branch is ahead of or behind the remote branch
-        behind_commits = list(repo.iter_commits(f'{branch_name}..origin/{branch_name}'))
-        ahead_commits = list(repo.iter_commits(f'origin/{branch_name}..{branch_name}'))
-
-        # If the local branch is behind, show the number and guidance
-        if behind_commits:
-            messages += f"\n{ANSWER_TEXT}{UNDERLINE_TEXT}Local branch {branch_name} is behind the remote origin by {len(behind_commits)} commits.{RESET_TEXT}\n"
-            # List files that are changed in the commits the local branch is behind
-            files_to_pull = []
-            for commit in behind_commits:
-                for modified_file in commit.stats.files:
-                    files_to_pull.append(modified_file)
-            files_to_pull = list(set(files_to_pull))  # Remove duplicates
-            messages += f"{ANSWER_TEXT}Files on remote to be pulled:\n"
-            for file in files_to_pull:
-                messages += f"{OUTPUT_TEXT}  - {file}{RESET_TEXT}\n\n"
-            messages += f"{HELP_TEXT}Guidance: Consider {WARNING_TEXT}(1.)PULLING{RESET_TEXT}{HELP_TEXT} the changes from the remote repository.{RESET_TEXT}\n"
-            messages += f"{HELP_TEXT}>    Files exist on the remote repository that you do not have locally.{RESET_TEXT}\n"
-            messages += f"{HELP_TEXT}>    Pulling the files will update your local copy of the repository to match the remote one.{RESET_TEXT}\n\n"
-
-        # If the local branch is ahead, show the commits and guidance
-        if ahead_commits:
-            messages += f"\n{ANSWER_TEXT}{UNDERLINE_TEXT}Local branch {branch_name} is ahead of the remote origin by {len(ahead_commits)} commits.{RESET_TEXT}\n"
-            messages += f"{ANSWER_TEXT}Commits waiting to be pushed:{RESET_TEXT}\n"
-            for commit in ahead_commits:
-                messages += f"{OUTPUT_TEXT}{commit.hexsha[:7]} - {commit.author.name}: {commit.summary}{RESET_TEXT}\n\n"
-            messages += f"{HELP_TEXT}Guidance: Consider {WARNING_TEXT}(2.)PUSHING{RESET_TEXT}{HELP_TEXT} your commits to synchronize with the remote repository.{RESET_TEXT}\n"
-            messages += f"{HELP_TEXT}>    Files exist on the local repository that do not exist on the remote one.{RESET_TEXT}\n"
-            messages += f"{HELP_TEXT}>    Pushing the files will update the remote repository to match the local one.{RESET_TEXT}\n\n"
+        # Compare against the remote-tracking refs we already have; fetching
+        # is left to the background FetchScheduler and to explicit pull/push
 
-        # Get the messages for uncommitted changes and untracked files
-        messages += get_uncommitted_changes(repo)
+        # One status scan gives the working tree changes and, when the branch
+        # tracks origin, the ahead/behind counts as well
+        status = get_repo_status(repo)
+        counts = (status.ahead, status.behind) if status.upstream == f'origin/{branch_name}' else None
+        status.ahead, status.behind, status.files_to_pull, status.commits_to_push = \
+            compare_branch_with_origin(repo, branch_name, counts)
 
-        return messages
-        
     except Exception as e:
-        # Return an error message if any exception occurs during the comparison
-        return f"{ERROR_TEXT}Error comparing with the origin: {e}{RESET_TEXT}"
+        # Record the error so the renderer can report it
+        status.error = f"Error comparing with the origin: {e}"
+
+    return status
+
+def compare_branch_with_origin(repo, branch_name, counts=None):
+    """
+    Return (ahead, behind, files_to_pull, commits_to_push) for branch_name
+    against origin/<branch_name>. counts is (ahead, behind) if already known.
+    ahead and behind are None when the branch is not on origin yet.
+    """
+    from src.git_fetch import has_remote_branch
+    if not has_remote_branch(repo, branch_name):
+        return None, None, [], []
+
+    ahead, behind = counts or count_ahead_behind(repo, branch_name, f'origin/{branch_name}')
+
+    # List files that are changed in the commits the local branch is behind
+    files_to_pull = get_changed_files(repo, f'{branch_name}..origin/{branch_name}') if behind else []
+
+    # Read only the unpushed commits that will be displayed
+    commits_to_push = []
+    if ahead:
+        commits_to_push = [
+            (commit.hexsha[:7], commit.author.name, commit.summary)
+            for commit in iter_commits_limited(repo, f'origin/{branch_name}..{branch_name}', MAX_COMMITS_DISPLAYED)
+        ]
+    return ahead, behind, files_to_pull, commits_to_push
@@ -0,0 +1,153 @@
+# workspace.py
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.git_status import get_repo_status
+from src.tag_index import get_tag_index
+from src.revisions import count_ahead_behind
+from src.config import WORKSPACE_JOBS, WORKSPACE_MAX_DEPTH
+
+class RepoSummary:
+    """One row of the workspace table: where a repository stands at a glance."""
+    __slots__ = (
+        'path', 'name', 'branch', 'latest_tag', 'ahead', 'behind',
+        'staged', 'unstaged', 'untracked', 'conflicted', 'error', 'seconds',
+    )
+
+    def __init__(self, path, name):
+        self.path = path
+        self.name = name
+        self.branch = None
+        self.latest_tag = None
+        self.ahead = None  # None when there is no origin/<branch> to compare with
+        self.behind = None
+        self.staged = self.unstaged = self.untracked = self.conflicted = 0
+        self.error = None
+        self.seconds = 0.0  # Time taken to collect this row
+
+    @property
+    def dirty(self):
+        return self.staged + self.unstaged + self.untracked + self.conflicted
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+# --- Find the repositories under a directory --- #
+def discover_repositories(root, max_depth=WORKSPACE_MAX_DEPTH):
+    """
+    Return the working tree paths of the Git repositories under root, sorted.
+
+    A directory with a .git entry (a directory, or a file for worktrees and
+    submodules) is a repository and is not searched any further. Hidden
+    directories are skipped.
+    """
+    found = []
+    pending = [(os.path.abspath(root), 0)]
+    while pending:
+        directory, depth = pending.pop()
+        if os.path.exists(os.path.join(directory, '.git')):
+            found.append(directory)
+            continue
+        if depth >= max_depth:
+            continue
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.name.startswith('.') and entry.is_dir(follow_symlinks=False):
+                        pending.append((entry.path, depth + 1))
+        except OSError:
+            continue
+    return sorted(found)
+
+# --- Summarise one repository --- #
+def collect_repo_summary(path, root=None):
+    """
+    Collect the branch, latest tag, ahead/behind and change counts for path.
+
+    Uses the remote-tracking refs already on disk; nothing is fetched. Errors
+    are recorded on the summary instead of being raised.
+    """
+    from git import Repo
+
+    started = time.perf_counter()
+    summary = RepoSummary(path, os.path.relpath(path, root) if root else os.path.basename(path))
+    repo = None
+    try:
+        repo = Repo(path)
+        status = get_repo_status(repo)
+        summary.branch = status.branch
+        summary.latest_tag = get_tag_index(repo).latest()
+
+        if status.branch and status.upstream == f'origin/{status.branch}':
+            summary.ahead, summary.behind = status.ahead, status.behind
+        elif status.branch:
+            try:
+                summary.ahead, summary.behind = count_ahead_behind(repo, status.branch, f'origin/{status.branch}')
+            except Exception:
+                # No origin/<branch> to compare with
+                pass
+
+        counts = status.counts()
+        summary.staged = counts['staged']
+        summary.unstaged = counts['unstaged']
+        summary.untracked = counts['untracked']
+        summary.conflicted = counts['conflicted']
+    except Exception as e:
+        summary.error = f"{type(e).__name__}: {e}".strip()
+    finally:
+        if repo is not None:
+            repo.close()
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+# --- Summarise every repository in parallel --- #
+def collect_workspace(root, jobs=WORKSPACE_JOBS, max_depth=WORKSPACE_MAX_DEPTH):
+    """
+    Return a RepoSummary for every repository under root, in path order.
+
+    Each summary is a handful of short git processes, so a bounded thread pool
+    runs them side by side and the total time stays close to the slowest repo.
+    """
+    paths = discover_repositories(root, max_depth)
+    if not paths:
+        return []
+    root = os.path.abspath(root)
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(paths)))) as pool:
+        return list(pool.map(lambda path: collect_repo_summary(path, root), paths))
+
+# --- Sort and filter the table --- #
+# Sort keys put the rows that need attention first for the numeric columns
+WORKSPACE_SORT_KEYS = {
+    'name': lambda summary: summary.name,
+    'branch': lambda summary: (summary.branch or '', summary.name),
+    'tag': lambda summary: (summary.latest_tag or '', summary.name),
+    'ahead': lambda summary: (-(summary.ahead or 0), summary.name),
+    'behind': lambda summary: (-(summary.behind or 0), summary.name),
+    'dirty': lambda summary: (-summary.dirty, summary.name),
+    'time': lambda summary: (-summary.seconds, summary.name),
+}
+
+WORKSPACE_FILTERS = {
+    'all': lambda summary: True,
+    'dirty': lambda summary: summary.dirty > 0,
+    'ahead': lambda summary: bool(summary.ahead),
+    'behind': lambda summary: bool(summary.behind),
+    'diverged': lambda summary: bool(summary.ahead) and bool(summary.behind),
+    'conflicted': lambda summary: summary.conflicted > 0,
+    'error': lambda summary: summary.error is not None,
+    # Anything that is not clean and in sync with origin
+    'attention': lambda summary: (
+        summary.dirty > 0 or bool(summary.ahead) or bool(summary.behind) or summary.error is not None
+    ),
+}
+
+def select_summaries(summaries, sort='name', state='all', match=None):
+    """Return the summaries in the given state whose name contains match, sorted."""
+    keep = WORKSPACE_FILTERS[state]
+    selected = [
+        summary for summary in summaries
+        if keep(summary) and (not match or match.lower() in summary.name.lower())
+    ]
+    selected.sort(key=WORKSPACE_SORT_KEYS[sort])
+    return selected